@@ -1,17 +1,74 @@
 import asyncio
+import logging
 import re
 from typing import Optional, Callable, Dict, Any
-from utils.helpers import sanitize_message, extract_username_from_message
+from utils.helpers import sanitize_message, parse_naken_message
+
+# Bytes that sanitize_message() would strip or remove from either end of a line
+_BLANK_BYTES = b'\x00 \t\r\n\x0b\x0c'
+
+# Bytes requested from the stream per read; lines are split in Python
+_READ_SIZE = 65536
+
+# Longest unterminated line kept, matching StreamReader's default readline() limit
+_MAX_LINE_BYTES = 65536
+
+# Upper bound on distinct commands whose encoded bytes are kept
+_COMMAND_CACHE_SIZE = 64
+
+# Drain the writer once this many bytes are buffered or after this many writes
+_DRAIN_HIGH_WATER = 16384
+_DRAIN_EVERY = 8
 
 class NakenChatClient:
     """Telnet client for connecting to NakenChat server"""
     
+    # All system-message shapes in one alternation so a single match decides
+    _SYSTEM_RE = re.compile(r"""
+        ^(?:
+            >>\s+                                   # Server messages starting with >>
+          | \[.*\]\s*$                              # Empty brackets
+          | Total:\s*\d+                            # User count messages
+          | Name\s+Channel\s+Location               # User list headers
+          | List\ of\ commands:                     # Help headers
+          | You\ just\ logged\ on                   # Login messages
+          | has\ (?:joined|left|quit)               # Join/leave messages
+          | http://                                 # Any HTTP URLs (incl. website/email banners)
+          | email:                                  # Email messages
+          | Command\ from\ https:                   # Command info messages
+          | <\d+>[^:]+\ \(private\):                # Private messages: <9>bob (private): hi
+          | Message\ sent\ to\ \[\d+\][^:]+:\ <\d+>[^:]+\ \(private\):  # Private message confirmations
+        )
+    """, re.VERBOSE)
+    
+    # Literal prefixes of every _SYSTEM_RE branch except the '[' and '<' ones
+    _SYSTEM_PREFIXES = (
+        '>>', 'Total:', 'Name', 'List of commands:', 'You just logged on', 'has ',
+        'http://', 'email:', 'Command from https:', 'Message sent to ',
+    )
+    
     def __init__(self, config: Dict[str, Any], logger, message_handler: Callable):
         self.config = config['nakenchat']
         self.bot_config = config['bot']
         self.logger = logger
         self.message_handler = message_handler
         
+        # Settings are fixed for the client's lifetime, so resolve them once
+        self._host = self.config['host']
+        self._port = self.config['port']
+        self._max_reconnect = self.config['max_reconnect_attempts']
+        self._reconnect_delay = self.config['reconnect_delay']
+        self._username = self.bot_config['username']
+        
+        # Compile the bot's own message patterns once
+        bot_username = re.escape(self._username)
+        self._bot_patterns = (
+            re.compile(rf'^\[(\d+)\]{bot_username}:'),
+            re.compile(rf'^<(\d+)>{bot_username}:'),
+            re.compile(rf'^{bot_username}:'),
+        )
+        self._bot_marker = f"{self._username}:"
+        
         self.reader = None
         self.writer = None
         self.is_connected = False
@@ -20,23 +77,45 @@ class NakenChatClient:
         self.listen_task = None  # Track the listening task
         self.should_stop = False
         
+        # Writes since the last drain()
+        self._pending_writes = 0
+        
+        # Encoded bytes of commands already sent, keyed by command text
+        self._command_cache: Dict[str, bytes] = {}
+        
+        # Whether per-message debug lines are worth formatting; refreshed on connect
+        self._debug = self.logger.isEnabledFor(logging.DEBUG)
+        
     async def connect(self) -> bool:
         """Connect to NakenChat server"""
+        return await self.open_connection() and await self.join()
+    
+    async def open_connection(self) -> bool:
+        """Open the connection to the NakenChat server without joining the chat yet"""
         try:
-            self.logger.info(f"Connecting to NakenChat server at {self.config['host']}:{self.config['port']}")
+            self._debug = self.logger.isEnabledFor(logging.DEBUG)
+            self.logger.info(f"Connecting to NakenChat server at {self._host}:{self._port}")
             
             self.reader, self.writer = await asyncio.open_connection(
-                self.config['host'], 
-                self.config['port']
+                self._host, 
+                self._port
             )
             
             self.is_connected = True
             self.reconnect_attempts = 0
             self.logger.info("Successfully connected to NakenChat server")
-
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Failed to connect to NakenChat server: {e}")
+            return False
+    
+    async def join(self) -> bool:
+        """Set the bot's name and start listening on an open connection"""
+        try:
             # Set bot name using .n <username>
-            await self.send_command(f".n {self.bot_config['username']}")
-            self.logger.info(f"Sent .n {self.bot_config['username']} to set bot name")
+            await self.send_command(f".n {self._username}")
+            self.logger.info(f"Sent .n {self._username} to set bot name")
             
             # Wait a moment for the server to process the name change
             await asyncio.sleep(1)
@@ -47,7 +126,7 @@ class NakenChatClient:
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to connect to NakenChat server: {e}")
+            self.logger.error(f"Failed to join NakenChat: {e}")
             return False
     
     async def disconnect(self):
@@ -96,15 +175,35 @@ class NakenChatClient:
     
     async def send_message(self, message: str):
         """Send message to NakenChat server"""
+        # Add newline and encode
+        return await self._send_bytes(f"{message}\n".encode('utf-8'), message)
+    
+    async def send_command(self, command: str):
+        """Send command to NakenChat server"""
+        # Commands are few and repeat (.n <name>, .q), so reuse their encoded form
+        data = self._command_cache.get(command)
+        if data is None:
+            data = f"{command}\n".encode('utf-8')
+            if len(self._command_cache) < _COMMAND_CACHE_SIZE:
+                self._command_cache[command] = data
+        return await self._send_bytes(data, command)
+    
+    async def _send_bytes(self, data: bytes, message: str):
+        """Write an already encoded line to the server"""
         if not self.is_connected or not self.writer:
             self.logger.warning("Cannot send message: not connected")
             return False
         
         try:
-            # Add newline and encode
-            full_message = f"{message}\n"
-            self.writer.write(full_message.encode('utf-8'))
-            await self.writer.drain()
+            self.writer.write(data)
+            
+            # Only wait on the socket when output is backing up, or every few
+            # writes so errors still surface promptly
+            self._pending_writes += 1
+            if (self._pending_writes >= _DRAIN_EVERY
+                    or self.writer.transport.get_write_buffer_size() > _DRAIN_HIGH_WATER):
+                self._pending_writes = 0
+                await self.writer.drain()
             
             self.logger.debug(f"Sent message: {message}")
             return True
@@ -114,32 +213,42 @@ class NakenChatClient:
             await self._handle_connection_error()
             return False
     
-    async def send_command(self, command: str):
-        """Send command to NakenChat server"""
-        return await self.send_message(command)
-    
     async def _listen_for_messages(self):
         """Listen for incoming messages from the server"""
+        # Holds the trailing partial line between reads
+        buffer = bytearray()
+        # Last line handed to _process_line, for error reporting
+        data = None
         try:
             while self.is_connected and self.reader and not self.should_stop:
                 try:
-                    # Read line from server
-                    data = await self.reader.readline()
+                    # Read whatever the server has sent and split lines ourselves,
+                    # so a burst of lines costs one await instead of one per line
+                    chunk = await self.reader.read(_READ_SIZE)
                     
-                    if not data:
-                        # Connection closed by server
+                    if not chunk:
+                        # Connection closed by server, flush any unterminated line
+                        if buffer:
+                            data = bytes(buffer)
+                            await self._process_line(data)
                         if not self.should_stop:
                             self.logger.warning("Server closed connection")
                         break
                     
-                    # Decode and process message
-                    message = data.decode('utf-8', errors='ignore')
+                    buffer += chunk
+                    if b'\n' in chunk:
+                        lines = buffer.split(b'\n')
+                        buffer = lines.pop()
+                        for data in lines:
+                            # Leave the rest of the batch once shutdown is requested
+                            if self.should_stop:
+                                break
+                            await self._process_line(data)
                     
-                    # Debug: Log raw message to see what's causing the error
-                    if not self.should_stop:
-                        self.logger.debug(f"Raw message from server: {repr(message)}")
-                    
-                    await self._process_message(message)
+                    # A server that never sends a newline must not grow the buffer
+                    # without bound; treated like readline()'s limit error
+                    if len(buffer) > _MAX_LINE_BYTES:
+                        raise ValueError(f"Line exceeds {_MAX_LINE_BYTES} bytes without a newline")
                     
                 except asyncio.CancelledError:
                     break
@@ -147,8 +256,8 @@ class NakenChatClient:
                     if not self.should_stop:
                         self.logger.error(f"Error reading message: {e}")
                         # Log the last message that might have caused the error
-                        if 'data' in locals():
-                            self.logger.error(f"Last message was: {repr(data.decode('utf-8', errors='ignore') if data else 'None')}")
+                        if data is not None:
+                            self.logger.error(f"Last message was: {repr(data.decode('utf-8', errors='ignore'))}")
                     break
             
         except asyncio.CancelledError:
@@ -162,6 +271,22 @@ class NakenChatClient:
             if not self.should_stop:
                 await self._handle_connection_error()
     
+    async def _process_line(self, data: bytes):
+        """Decode a single raw line from the server and process it"""
+        # Drop blank/NUL-only lines before paying for a decode
+        line = data.strip(_BLANK_BYTES)
+        if not line:
+            return
+        
+        # Decode and process message
+        message = line.decode('utf-8', errors='ignore')
+        
+        # Debug: Log raw message to see what's causing the error
+        if self._debug and not self.should_stop:
+            self.logger.debug(f"Raw message from server: {repr(message)}")
+        
+        await self._process_message(message)
+    
     async def _process_message(self, message: str):
         """Process incoming message"""
         # Sanitize message
@@ -170,23 +295,34 @@ class NakenChatClient:
         if not clean_message:
             return
         
-        self.logger.debug(f"Received: {clean_message}")
+        if self._debug:
+            self.logger.debug(f"Received: {clean_message}")
         
         # Skip system messages and bot's own messages
         if self._is_system_message(clean_message):
-            self.logger.debug(f"Skipping system message: {clean_message}")
-            return
-        
-        if self._is_bot_message(clean_message):
-            self.logger.debug(f"Skipping bot message: {clean_message}")
+            if self._debug:
+                self.logger.debug(f"Skipping system message: {clean_message}")
             return
         
         # Extract username and content
-        username = extract_username_from_message(clean_message)
-        content = self._extract_message_content(clean_message)
+        parts = parse_naken_message(clean_message)
+        
+        if parts is not None:
+            username, content = parts
+            is_bot = username == self._username
+        else:
+            # Irregular line shape with no username; pass the whole line on
+            is_bot = self._is_bot_message(clean_message)
+            username, content = None, clean_message
+        
+        if is_bot:
+            if self._debug:
+                self.logger.debug(f"Skipping bot message: {clean_message}")
+            return
         
         if not content:
-            self.logger.debug(f"No content extracted from: {clean_message}")
+            if self._debug:
+                self.logger.debug(f"No content extracted from: {clean_message}")
             return
         
         # Call message handler
@@ -197,72 +333,32 @@ class NakenChatClient:
     
     def _is_system_message(self, message: str) -> bool:
         """Check if message is a system message"""
-        system_patterns = [
-            r'^>>\s+',  # Server messages starting with >>
-            r'^\[.*\]\s*$',  # Empty brackets
-            r'^Total:\s*\d+',  # User count messages
-            r'^Name\s+Channel\s+Location',  # User list headers
-            r'^List of commands:',  # Help headers
-            r'^You just logged on',  # Login messages
-            r'^has joined|has left|has quit',  # Join/leave messages
-            r'^http://.*email:',  # Welcome/info messages with website and email
-            r'^http://',  # Any HTTP URLs
-            r'^email:',  # Email messages
-            r'^Command from https:',  # Command info messages
-            r'^<(\d+)>[^:]+ \(private\):',  # Private messages: <9>bob (private): hi
-            r'^Message sent to \[(\d+)\][^:]+: <(\d+)>[^:]+ \(private\):',  # Private message confirmations
-        ]
-        
-        for pattern in system_patterns:
-            if re.match(pattern, message):
-                return True
+        first = message[:1]
+        if first == '[':
+            # Ordinary "[1]user: text" lines can only be system if fully bracketed
+            if not message.rstrip().endswith(']'):
+                return False
+        elif first == '<':
+            # "<1>user: text" lines are only system messages when private
+            if 'private' not in message:
+                return False
+        elif not message.startswith(self._SYSTEM_PREFIXES):
+            return False
         
-        return False
+        return self._SYSTEM_RE.match(message) is not None
     
     def _is_bot_message(self, message: str) -> bool:
         """Check if message is from the bot itself"""
-        bot_username = self.bot_config['username']
+        if self._bot_marker not in message:
+            return False
         
         # Check various message formats
-        patterns = [
-            rf'^\[(\d+)\]{re.escape(bot_username)}:',
-            rf'^<(\d+)>{re.escape(bot_username)}:',
-            rf'^{re.escape(bot_username)}:',
-        ]
-        
-        for pattern in patterns:
-            if re.match(pattern, message):
+        for pattern in self._bot_patterns:
+            if pattern.match(message):
                 return True
         
         return False
     
-    def _extract_message_content(self, message: str) -> str:
-        """Extract message content from various formats"""
-        # Remove user prefixes
-        patterns = [
-            r'^\[(\d+)\]([^:]+):\s*(.+)$',
-            r'^<(\d+)>([^:]+):\s*(.+)$',
-            r'^([^:]+):\s*(.+)$'
-        ]
-        
-        for pattern in patterns:
-            try:
-                match = re.match(pattern, message)
-                if match:
-                    groups = match.groups()
-                    if len(groups) >= 3:
-                        # Pattern with group number: [1]username: message
-                        return groups[2]  # Message content is the third group
-                    elif len(groups) >= 2:
-                        # Pattern without group number: username: message
-                        return groups[1]  # Message content is the second group
-            except (IndexError, AttributeError) as e:
-                # Log the error for debugging but continue with next pattern
-                self.logger.debug(f"Error parsing message '{message}' with pattern '{pattern}': {e}")
-                continue
-        
-        return message
-    
     async def _handle_connection_error(self):
         """Handle connection errors and attempt reconnection"""
         self.is_connected = False
@@ -271,39 +367,37 @@ class NakenChatClient:
         if self.should_stop:
             return
         
-        if self.reconnect_attempts >= self.config['max_reconnect_attempts']:
-            if not self.should_stop:
-                self.logger.error("Max reconnection attempts reached")
+        # A single reconnect loop handles every retry; don't start a second one
+        if self.reconnect_task and not self.reconnect_task.done():
             return
         
-        self.reconnect_attempts += 1
-        if not self.should_stop:
-            self.logger.info(f"Attempting reconnection {self.reconnect_attempts}/{self.config['max_reconnect_attempts']}")
-        
-        # Schedule reconnection
-        self.reconnect_task = asyncio.create_task(self._reconnect())
+        self.reconnect_task = asyncio.create_task(self._reconnect_loop())
     
-    async def _reconnect(self):
-        """Attempt to reconnect to the server"""
+    async def _reconnect_loop(self):
+        """Attempt to reconnect until connected, stopped, or out of attempts"""
         try:
-            await asyncio.sleep(self.config['reconnect_delay'])
-            
-            # Check if we should stop reconnecting
-            if self.should_stop:
-                return
-            
-            if await self.connect():
-                if not self.should_stop:
-                    self.logger.info("Successfully reconnected")
-            else:
-                # Schedule another reconnection attempt
-                if not self.should_stop:
-                    self.reconnect_task = asyncio.create_task(self._reconnect())
+            while not self.should_stop:
+                if self.reconnect_attempts >= self._max_reconnect:
+                    self.logger.error("Max reconnection attempts reached")
+                    return
+                
+                self.reconnect_attempts += 1
+                self.logger.info(f"Attempting reconnection {self.reconnect_attempts}/{self._max_reconnect}")
+                
+                await asyncio.sleep(self._reconnect_delay)
+                
+                # Check if we should stop reconnecting
+                if self.should_stop:
+                    return
+                
+                try:
+                    if await self.connect():
+                        if not self.should_stop:
+                            self.logger.info("Successfully reconnected")
+                        return
+                except Exception as e:
+                    if not self.should_stop:
+                        self.logger.error(f"Reconnection failed: {e}")
                 
         except asyncio.CancelledError:
             pass
-        except Exception as e:
-            if not self.should_stop:
-                self.logger.error(f"Reconnection failed: {e}")
-                # Schedule another reconnection attempt
-                self.reconnect_task = asyncio.create_task(self._reconnect()) 
\ No newline at end of file
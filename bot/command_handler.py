@@ -1,3 +1,4 @@
+import re
 from typing import Dict, Any, Optional, Callable
 from utils.helpers import parse_command
 
@@ -25,25 +26,70 @@ class CommandHandler:
         }
         
         self.current_model = config['ollama']['model']
+        
+        # The configured trigger is fixed, so commands for it are matched with a
+        # precompiled pattern: trigger, command word, then optional arguments
+        self.trigger = config['bot']['trigger']
+        self._command_re = re.compile(
+            rf'{re.escape(self.trigger)}\s*(\S+)(?:\s+(.*\S))?',
+            re.IGNORECASE | re.DOTALL
+        )
+        
+        # Help and info text only depend on config, so build them once
+        bot_config = config['bot']
+        bot_name = bot_config['name']
+        self._help_text = f"""
+Available commands:
+{bot_name} help - Show this help message
+{bot_name} model <name> - Change AI model (e.g., {bot_name} model llama2)
+{bot_name} models - List available models
+{bot_name} stats - Show bot statistics
+{bot_name} context - Show context information
+{bot_name} clear - Clear your conversation context
+{bot_name} ping - Test bot response
+{bot_name} info - Show bot information
+{bot_name} reset - Reset rate limiting for your user
+
+To ask me something, just mention my name followed by your question!
+        """.strip()
+        
+        # Info text is split around the model name, the only field that changes
+        self._info_head = f"""
+{bot_name} Information:
+• Version: 1.0.0
+• Trigger: {bot_config['trigger']}
+• Model: """.lstrip()
+        self._info_tail = f"""
+• Max response length: {bot_config['max_response_length']}
+• Context length: {bot_config['context_length']}
+• Rate limiting: {'Enabled' if config['behavior']['rate_limit']['enabled'] else 'Disabled'}"""
     
     async def handle_command(self, username: str, message: str, trigger: str) -> Optional[str]:
         """Handle a bot command and return response"""
-        parsed = parse_command(message, trigger)
-        if not parsed:
-            return None
-        
-        command = parsed['command']
-        args = parsed['args']
+        if trigger and trigger == self.trigger:
+            match = self._command_re.search(message)
+            if not match:
+                return None
+            command = match.group(1).lower()
+            args = match.group(2) or ""
+        else:
+            parsed = parse_command(message, trigger)
+            if not parsed:
+                return None
+            
+            command = parsed['command']
+            args = parsed['args']
         
         self.logger.info(f"Command from {username}: {command} {args}")
         
         # Check if command exists
-        if command not in self.commands:
+        handler = self.commands.get(command)
+        if handler is None:
             return f"Unknown command: {command}. Type '{trigger} help' for available commands."
         
         # Execute command
         try:
-            response = await self.commands[command](username, args)
+            response = await handler(username, args)
             return response
         except Exception as e:
             self.logger.error(f"Error executing command {command}: {e}")
@@ -51,23 +97,7 @@ class CommandHandler:
     
     async def _cmd_help(self, username: str, args: str) -> str:
         """Show help information"""
-        bot_name = self.config['bot']['name']
-        help_text = f"""
-Available commands:
-{bot_name} help - Show this help message
-{bot_name} model <name> - Change AI model (e.g., {bot_name} model llama2)
-{bot_name} models - List available models
-{bot_name} stats - Show bot statistics
-{bot_name} context - Show context information
-{bot_name} clear - Clear your conversation context
-{bot_name} ping - Test bot response
-{bot_name} info - Show bot information
-{bot_name} reset - Reset rate limiting for your user
-
-To ask me something, just mention my name followed by your question!
-        """.strip()
-        
-        return help_text
+        return self._help_text
     
     async def _cmd_model(self, username: str, args: str) -> str:
         """Change the AI model"""
@@ -86,7 +116,7 @@ To ask me something, just mention my name followed by your question!
     
     async def _cmd_models(self, username: str, args: str) -> str:
         """List available models"""
-        models = await self.ollama_client.list_models()
+        models = await self.ollama_client.list_models(refresh=True)
         if models:
             current = self.current_model
             model_list = "\n".join([f"• {model}" + (" (current)" if model == current else "") for model in models])
@@ -133,18 +163,7 @@ Bot Statistics:
     
     async def _cmd_info(self, username: str, args: str) -> str:
         """Show bot information"""
-        bot_name = self.config['bot']['name']
-        info_text = f"""
-{bot_name} Information:
-• Version: 1.0.0
-• Trigger: {self.config['bot']['trigger']}
-• Model: {self.current_model}
-• Max response length: {self.config['bot']['max_response_length']}
-• Context length: {self.config['bot']['context_length']}
-• Rate limiting: {'Enabled' if self.config['behavior']['rate_limit']['enabled'] else 'Disabled'}
-        """.strip()
-        
-        return info_text
+        return f"{self._info_head}{self.current_model}{self._info_tail}"
     
     async def _cmd_reset(self, username: str, args: str) -> str:
         """Reset rate limiting for user"""
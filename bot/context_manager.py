@@ -1,5 +1,6 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from collections import deque
+import heapq
 import time
 
 class ContextManager:
@@ -10,16 +11,36 @@ class ContextManager:
         self.enabled = self.config['enable_context']
         self.max_context_length = self.config['context_length']
         
-        # Store context per user
+        # Upper bound on context characters sent with a prompt; 0 (the default) disables it
+        self.max_context_chars = self.config.get('max_context_chars', 0)
+        
+        # Store context per user; entries are (message_id, formatted_message)
         self.user_contexts: Dict[str, deque] = {}
         
-        # Global context for general chat
+        # Global context for general chat, same entry shape as user contexts
         self.global_context = deque(maxlen=self.max_context_length)
         
         # Context timestamps for cleanup
         self.context_timestamps: Dict[str, float] = {}
         self.context_ttl = 3600  # 1 hour TTL for context
         
+        # Min-heap of (expires_at, username); entries go stale when a user posts again
+        self._expiry_heap: List[Tuple[float, str]] = []
+        
+        # Expiry is best-effort, so cleanup runs at most once per interval
+        self.cleanup_interval = 60.0
+        self._last_cleanup = 0.0
+        
+        # Version counters bumped on every add, used to reuse joined context strings
+        self._global_version = 0
+        self._user_versions: Dict[str, int] = {}
+        self._context_cache: Dict[Tuple[str, bool], Tuple[Tuple[int, int], str]] = {}
+        
+        # Author of the most recent messages and how many they posted in a row;
+        # lets get_context skip the global merge when it holds nothing new
+        self._run_author: Optional[str] = None
+        self._run_length = 0
+        
     def add_message(self, username: str, message: str, is_bot: bool = False):
         """Add a message to the conversation context"""
         if not self.enabled:
@@ -30,73 +51,138 @@ class ContextManager:
         # Format message for context
         formatted_message = f"{username}: {message}" if not is_bot else f"Assistant: {message}"
         
+        # The global version is bumped once per message, so it doubles as a
+        # unique, monotonic message id
+        self._global_version += 1
+        entry = (self._global_version, formatted_message)
+        
         # Add to user-specific context
-        if username not in self.user_contexts:
-            self.user_contexts[username] = deque(maxlen=self.max_context_length)
+        user_context = self.user_contexts.get(username)
+        if user_context is None:
+            user_context = self.user_contexts[username] = deque(maxlen=self.max_context_length)
         
-        self.user_contexts[username].append(formatted_message)
+        user_context.append(entry)
         self.context_timestamps[username] = current_time
+        heapq.heappush(self._expiry_heap, (current_time + self.context_ttl, username))
+        self._user_versions[username] = self._user_versions.get(username, 0) + 1
         
         # Add to global context
-        self.global_context.append(formatted_message)
+        self.global_context.append(entry)
+        if username == self._run_author:
+            self._run_length += 1
+        else:
+            self._run_author = username
+            self._run_length = 1
         
         # Cleanup old contexts
-        self._cleanup_old_contexts(current_time)
+        if current_time - self._last_cleanup >= self.cleanup_interval:
+            self._cleanup_old_contexts(current_time)
+            self._last_cleanup = current_time
     
     def get_context(self, username: str, include_global: bool = True) -> str:
         """Get conversation context for a user"""
         if not self.enabled:
             return ""
         
-        context_parts = []
+        # Reuse the last joined string if nothing it depends on has changed
+        key = (username, include_global)
+        stamp = (self._user_versions.get(username, 0), self._global_version if include_global else 0)
+        cached = self._context_cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
         
         # Get user-specific context
-        if username in self.user_contexts:
-            user_context = list(self.user_contexts[username])
-            if user_context:
-                context_parts.extend(user_context)
+        user_context = self.user_contexts.get(username)
+        user_parts = list(user_context) if user_context else []
+        other_parts = []
         
-        # Add global context if requested
-        if include_global and self.global_context:
-            global_context = list(self.global_context)
+        # Add global context if requested, unless it only holds this user's
+        # own messages, which are already in their context
+        if include_global and self.global_context and not self._global_is_own(username):
             # Avoid duplicating messages already in user context
-            if context_parts:
+            if user_context:
                 # Only add global messages not already in user context
-                for msg in global_context:
-                    if msg not in context_parts:
-                        context_parts.append(msg)
+                user_ids = {message_id for message_id, _ in user_context}
+                other_parts = [entry for entry in self.global_context if entry[0] not in user_ids]
             else:
-                context_parts.extend(global_context)
+                other_parts = list(self.global_context)
+        
+        context_parts = user_parts + other_parts
+        if self.max_context_chars:
+            context_parts = self._trim_to_budget(user_parts, other_parts)
         
-        return "\n".join(context_parts)
+        context = "\n".join(msg for _, msg in context_parts)
+        self._context_cache[key] = (stamp, context)
+        return context
+    
+    def _global_is_own(self, username: str) -> bool:
+        """Check if every global message is still in the user's own context"""
+        # User deques share the global maxlen, so a run covering the whole
+        # global deque is also contained in the user's deque
+        return (
+            self._run_author == username
+            and self._run_length >= len(self.global_context)
+            and username in self.user_contexts
+        )
+    
+    def _trim_to_budget(self, user_parts: List[Tuple[int, str]],
+                        other_parts: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+        """Keep the messages whose joined length fits max_context_chars
+        
+        The requesting user's own messages get room first, newest first; the
+        rest of the budget goes to other users' messages, also newest first.
+        """
+        parts = user_parts + other_parts
+        total = sum(len(msg) for _, msg in parts) + len(parts) - 1
+        if total <= self.max_context_chars:
+            return parts
+        
+        kept = set()
+        total = -1  # No separator before the first kept message
+        for message_id, msg in [*reversed(user_parts), *reversed(other_parts)]:
+            total += len(msg) + 1
+            if total > self.max_context_chars:
+                break
+            kept.add(message_id)
+        
+        return [entry for entry in parts if entry[0] in kept]
     
     def clear_user_context(self, username: str):
         """Clear context for a specific user"""
-        if username in self.user_contexts:
-            del self.user_contexts[username]
-        
-        if username in self.context_timestamps:
-            del self.context_timestamps[username]
+        self.user_contexts.pop(username, None)
+        self.context_timestamps.pop(username, None)
+        
+        self._user_versions.pop(username, None)
+        if self._run_author == username:
+            self._run_author = None
+            self._run_length = 0
+        self._context_cache.pop((username, True), None)
+        self._context_cache.pop((username, False), None)
     
     def clear_all_context(self):
         """Clear all conversation context"""
         self.user_contexts.clear()
         self.global_context.clear()
         self.context_timestamps.clear()
+        self._expiry_heap.clear()
+        self._user_versions.clear()
+        self._context_cache.clear()
+        self._run_author = None
+        self._run_length = 0
     
     def _cleanup_old_contexts(self, current_time: float):
         """Remove contexts older than TTL"""
         cutoff_time = current_time - self.context_ttl
         
-        # Find users with old contexts
-        users_to_remove = []
-        for username, timestamp in self.context_timestamps.items():
-            if timestamp < cutoff_time:
-                users_to_remove.append(username)
-        
-        # Remove old contexts
-        for username in users_to_remove:
-            self.clear_user_context(username)
+        # Only entries at the head of the heap can be due
+        heap = self._expiry_heap
+        while heap and heap[0][0] < current_time:
+            _, username = heapq.heappop(heap)
+            
+            # Skip stale entries for users who have posted since
+            timestamp = self.context_timestamps.get(username)
+            if timestamp is not None and timestamp < cutoff_time:
+                self.clear_user_context(username)
     
     def get_context_stats(self) -> Dict[str, int]:
         """Get statistics about context usage"""
@@ -111,11 +197,12 @@ class ContextManager:
         """Change the maximum context length"""
         self.max_context_length = length
         
-        # Update existing deques
-        for username in list(self.user_contexts.keys()):
-            old_context = list(self.user_contexts[username])
+        # Update existing deques; deque() copies straight from the old deque
+        for username, old_context in self.user_contexts.items():
             self.user_contexts[username] = deque(old_context, maxlen=length)
         
         # Update global context
-        old_global = list(self.global_context)
-        self.global_context = deque(old_global, maxlen=length) 
\ No newline at end of file
+        self.global_context = deque(self.global_context, maxlen=length)
+        
+        # Shorter deques may have dropped messages from cached strings
+        self._context_cache.clear() 
\ No newline at end of file
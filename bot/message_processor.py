@@ -1,6 +1,7 @@
 import asyncio
+import re
 from typing import Optional, Dict, Any
-from utils.helpers import is_bot_trigger, truncate_response, safe_delay
+from utils.helpers import truncate_response, safe_delay, is_bot_trigger
 
 class MessageProcessor:
     """Processes incoming messages and manages bot responses"""
@@ -16,11 +17,20 @@ class MessageProcessor:
         self.command_handler = command_handler
         
         self.bot_config = config['bot']
+        self.ollama_config = config['ollama']
+        self._bot_username = self.bot_config['username']
         self.trigger = self.bot_config['trigger']
         self.response_delay = self.bot_config['response_delay']
         self.max_response_length = self.bot_config['max_response_length']
         
-        # Track processing tasks to avoid duplicates
+        # Trigger followed by the optional ':', '-', '>', '|' separators (in that
+        # order, each at most once) and then the prompt itself
+        self._trigger_re = re.compile(
+            re.escape(self.trigger) + r'\s*(?::\s*)?(?:-\s*)?(?:>\s*)?(?:\|\s*)?(.*)',
+            re.IGNORECASE | re.DOTALL
+        )
+        
+        # Users with a request in flight, to avoid duplicates
         self.processing_tasks = set()
     
     async def process_message(self, full_message: str, username: str, content: str):
@@ -33,7 +43,8 @@ class MessageProcessor:
         # Add message to context
         self.context_manager.add_message(username, content, is_bot=False)
         
-        # Check if message contains bot trigger (for AI responses)
+        # Check if message contains bot trigger (for AI responses); most chatter
+        # doesn't, so this is a single search before any other work
         if not is_bot_trigger(content, self.trigger):
             return
         
@@ -56,15 +67,12 @@ class MessageProcessor:
     async def _process_ai_request(self, username: str, prompt: str):
         """Process an AI request and generate response"""
         
-        # Create a unique task ID
-        task_id = f"{username}_{asyncio.get_event_loop().time()}"
-        
         # Check if already processing for this user
-        if task_id in self.processing_tasks:
+        if username in self.processing_tasks:
             self.logger.debug(f"Already processing request for {username}")
             return
         
-        self.processing_tasks.add(task_id)
+        self.processing_tasks.add(username)
         
         try:
             # Add delay before responding
@@ -73,21 +81,22 @@ class MessageProcessor:
             # Get conversation context
             context = self.context_manager.get_context(username)
             
-            # Get current model
-            current_model = self.config['ollama']['model']
+            # Get current model; read per request since startup may switch it
+            current_model = self.ollama_config['model']
             
             # Generate response
             self.logger.info(f"Generating response for {username}: {prompt[:50]}...")
             
-            async with self.ollama_client as client:
-                response = await client.generate_response(prompt, context, current_model)
+            response = await self.ollama_client.generate_response(
+                prompt, context, current_model, max_chars=self.max_response_length
+            )
             
             if response:
                 # Truncate response if needed
                 response = truncate_response(response, self.max_response_length)
                 
                 # Add bot response to context
-                self.context_manager.add_message(self.bot_config['username'], response, is_bot=True)
+                self.context_manager.add_message(self._bot_username, response, is_bot=True)
                 
                 # Send response
                 await self.chat_client.send_message(response)
@@ -104,32 +113,20 @@ class MessageProcessor:
             await self.chat_client.send_message(error_msg)
         
         finally:
-            # Remove task from processing set
-            self.processing_tasks.discard(task_id)
+            # Remove user from processing set
+            self.processing_tasks.discard(username)
     
     def _extract_prompt(self, content: str) -> Optional[str]:
         """Extract the actual prompt from a message containing the bot trigger"""
         if not content:
             return None
         
-        # Remove the trigger word and clean up
-        trigger_lower = self.trigger.lower()
-        content_lower = content.lower()
-        
-        # Find trigger position
-        trigger_pos = content_lower.find(trigger_lower)
-        if trigger_pos == -1:
+        # Find the trigger and take everything after it, minus separators
+        match = self._trigger_re.search(content)
+        if not match:
             return None
         
-        # Extract text after trigger
-        after_trigger = content[trigger_pos + len(self.trigger):].strip()
-        
-        # Remove common separators
-        separators = [':', '-', '>', '|']
-        for sep in separators:
-            if after_trigger.startswith(sep):
-                after_trigger = after_trigger[1:].strip()
-        
+        after_trigger = match.group(1).strip()
         return after_trigger if after_trigger else None
     
     async def _send_rate_limit_message(self, username: str):
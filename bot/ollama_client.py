@@ -1,8 +1,24 @@
 import aiohttp
 import asyncio
+import time
 from typing import Optional, Dict, Any
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Use orjson for Ollama request/response bodies when available
+if orjson is not None:
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 class OllamaClient:
     """Client for interacting with Ollama API"""
     
@@ -13,22 +29,67 @@ class OllamaClient:
         self.base_url = f"{self.config['host']}:{self.config['port']}"
         self.session = None
         
+        # Generation options are fixed for the client's lifetime; the payload
+        # only references this dict, so it is shared between requests
+        self._options = {
+            "num_predict": self.config['max_tokens'],
+            "temperature": self.config['temperature']
+        }
+        self._timeout = aiohttp.ClientTimeout(total=self.config['timeout'])
+        self._generate_url = f"{self.base_url}/api/generate"
+        self._tags_url = f"{self.base_url}/api/tags"
+        
+        # Model list cache, refreshed after models_cache_ttl seconds
+        self._models_cache: Optional[list] = None
+        self._models_cache_time = 0.0
+        self.models_cache_ttl = 30.0
+        
+        # Replace {bot_name} placeholder once; the prompt head never changes
+        system_prompt = self.config['system_prompt'].replace('{bot_name}', self.bot_name)
+        self._prompt_head = f"{system_prompt}\n\n"
+        self._prompt_head_with_context = f"{system_prompt}\n\nRecent conversation:\n"
+        
+    async def start(self):
+        """Open the HTTP session shared by all requests"""
+        if self.session is None or self.session.closed:
+            # Keep connections to the single Ollama host alive and reuse DNS results
+            connector = aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=16,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._timeout,
+                json_serialize=_json_dumps
+            )
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+    
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.config['timeout'])
-        )
+        await self.start()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        await self.close()
     
-    async def generate_response(self, prompt: str, context: str = "", model: Optional[str] = None) -> Optional[str]:
-        """Generate response from Ollama API"""
+    async def generate_response(self, prompt: str, context: str = "", model: Optional[str] = None,
+                                max_chars: Optional[int] = None) -> Optional[str]:
+        """Generate response from Ollama API
+        
+        The response is streamed; once more than max_chars characters have
+        arrived the stream is closed so Ollama stops generating text that
+        would be truncated anyway.
+        """
         if not self.session:
-            self.logger.error("Ollama client not initialized. Use async context manager.")
+            self.logger.error("Ollama client not initialized. Call start() first.")
             return None
         
         model = model or self.config['model']
@@ -40,11 +101,8 @@ class OllamaClient:
         payload = {
             "model": model,
             "prompt": full_prompt,
-            "stream": False,
-            "options": {
-                "num_predict": self.config['max_tokens'],
-                "temperature": self.config['temperature']
-            }
+            "stream": True,
+            "options": self._options
         }
         
         try:
@@ -52,7 +110,7 @@ class OllamaClient:
             self.logger.debug(f"Prompt: {full_prompt[:100]}...")
             
             async with self.session.post(
-                f"{self.base_url}/api/generate",
+                self._generate_url,
                 json=payload,
                 headers={"Content-Type": "application/json"}
             ) as response:
@@ -62,13 +120,31 @@ class OllamaClient:
                     self.logger.error(f"Ollama API error {response.status}: {error_text}")
                     return None
                 
-                data = await response.json()
+                # Each streamed line is a JSON object carrying the next piece of text
+                parts = []
+                length = 0
+                data = None
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    
+                    data = _json_loads(line)
+                    if 'response' not in data:
+                        self.logger.error(f"Unexpected Ollama response format: {data}")
+                        return None
+                    
+                    token = data['response']
+                    parts.append(token)
+                    length += len(token)
+                    
+                    if data.get('done') or (max_chars and length > max_chars):
+                        break
                 
-                if 'response' not in data:
-                    self.logger.error(f"Unexpected Ollama response format: {data}")
+                if data is None:
+                    self.logger.error("Empty response from Ollama")
                     return None
                 
-                response_text = data['response'].strip()
+                response_text = "".join(parts).strip()
                 self.logger.debug(f"Generated response: {response_text[:100]}...")
                 
                 return response_text
@@ -85,33 +161,33 @@ class OllamaClient:
     
     def _build_prompt(self, prompt: str, context: str = "") -> str:
         """Build the full prompt with system message and context"""
-        system_prompt = self.config['system_prompt']
-        
-        # Replace {bot_name} placeholder with actual bot name
-        system_prompt = system_prompt.replace('{bot_name}', self.bot_name)
-        
         if context:
-            full_prompt = f"{system_prompt}\n\nRecent conversation:\n{context}\n\nUser: {prompt}\nAssistant:"
-        else:
-            full_prompt = f"{system_prompt}\n\nUser: {prompt}\nAssistant:"
+            return f"{self._prompt_head_with_context}{context}\n\nUser: {prompt}\nAssistant:"
         
-        return full_prompt
+        return f"{self._prompt_head}User: {prompt}\nAssistant:"
     
-    async def list_models(self) -> Optional[list]:
-        """List available models from Ollama"""
+    async def list_models(self, refresh: bool = False) -> Optional[list]:
+        """List available models from Ollama, reusing a recent result unless refresh is set"""
+        if (not refresh and self._models_cache is not None
+                and time.monotonic() - self._models_cache_time < self.models_cache_ttl):
+            return self._models_cache
+        
         if not self.session:
             self.logger.error("Ollama client not initialized")
             return None
         
         try:
-            async with self.session.get(f"{self.base_url}/api/tags") as response:
+            async with self.session.get(self._tags_url) as response:
                 if response.status != 200:
                     self.logger.error(f"Failed to list models: {response.status}")
                     return None
                 
-                data = await response.json()
+                data = _json_loads(await response.read())
                 models = [model['name'] for model in data.get('models', [])]
                 self.logger.info(f"Available models: {models}")
+                
+                self._models_cache = models
+                self._models_cache_time = time.monotonic()
                 return models
                 
         except Exception as e:
@@ -129,7 +205,8 @@ class OllamaClient:
     async def test_connection(self) -> bool:
         """Test connection to Ollama API"""
         try:
-            models = await self.list_models()
+            # Always hit the API; a cached list says nothing about the connection
+            models = await self.list_models(refresh=True)
             return models is not None
         except Exception as e:
             self.logger.error(f"Connection test failed: {e}")
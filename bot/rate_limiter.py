@@ -1,7 +1,7 @@
 import time
 import asyncio
-from typing import Dict, List, Optional
-from collections import defaultdict
+from typing import Dict, List, Optional, Deque
+from collections import defaultdict, deque
 
 class RateLimiter:
     """Rate limiter to prevent spam and abuse"""
@@ -12,24 +12,39 @@ class RateLimiter:
         self.max_requests = self.config['max_requests']
         self.time_window = self.config['time_window']
         
-        # Store request timestamps per user
-        self.user_requests: Dict[str, List[float]] = defaultdict(list)
+        # Store request timestamps per user, oldest first; a user never needs
+        # more than max_requests entries to be rate limited. deque rejects a
+        # negative maxlen, and max_requests <= 0 blocks every request anyway
+        user_maxlen = max(self.max_requests, 0)
+        self.user_requests: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=user_maxlen)
+        )
         
         # Global rate limiting
-        self.global_requests: List[float] = []
+        self.global_requests: Deque[float] = deque(maxlen=user_maxlen * 2)
+        
+        # Requests recorded since idle users were last swept out
+        self._records_since_sweep = 0
+        self.sweep_interval = 1000
         
     def is_allowed(self, user_id: str) -> bool:
         """Check if user is allowed to make a request"""
         if not self.enabled:
             return True
         
+        # A limit of zero (or less) allows nothing
+        if self.max_requests <= 0:
+            return False
+        
         current_time = time.time()
         
         # Clean old requests outside the time window
-        self._clean_old_requests(current_time)
+        self._clean_user(user_id, current_time)
+        self._clean_global(current_time)
         
         # Check user-specific rate limit
-        user_count = len(self.user_requests[user_id])
+        requests = self.user_requests.get(user_id)
+        user_count = len(requests) if requests else 0
         if user_count >= self.max_requests:
             return False
         
@@ -54,33 +69,47 @@ class RateLimiter:
         self.global_requests.append(current_time)
         
         # Clean old requests
-        self._clean_old_requests(current_time)
+        self._clean_user(user_id, current_time)
+        self._clean_global(current_time)
+        
+        # Occasionally drop users whose requests have all expired
+        self._records_since_sweep += 1
+        if self._records_since_sweep >= self.sweep_interval:
+            self._sweep_all_users(current_time)
     
-    def _clean_old_requests(self, current_time: float):
-        """Remove requests older than the time window"""
+    def _clean_user(self, user_id: str, current_time: float):
+        """Remove a user's requests older than the time window"""
+        requests = self.user_requests.get(user_id)
+        if requests is None:
+            return
+        
+        # Timestamps are appended in order, so stale ones are always at the left
         cutoff_time = current_time - self.time_window
+        while requests and requests[0] <= cutoff_time:
+            requests.popleft()
         
-        # Clean user requests
+        # Remove empty user entries
+        if not requests:
+            del self.user_requests[user_id]
+    
+    def _clean_global(self, current_time: float):
+        """Remove global requests older than the time window"""
+        cutoff_time = current_time - self.time_window
+        global_requests = self.global_requests
+        while global_requests and global_requests[0] <= cutoff_time:
+            global_requests.popleft()
+    
+    def _sweep_all_users(self, current_time: float):
+        """Clean every user's requests to reclaim memory from idle users"""
+        self._records_since_sweep = 0
         for user_id in list(self.user_requests.keys()):
-            self.user_requests[user_id] = [
-                req_time for req_time in self.user_requests[user_id]
-                if req_time > cutoff_time
-            ]
-            
-            # Remove empty user entries
-            if not self.user_requests[user_id]:
-                del self.user_requests[user_id]
-        
-        # Clean global requests
-        self.global_requests = [
-            req_time for req_time in self.global_requests
-            if req_time > cutoff_time
-        ]
+            self._clean_user(user_id, current_time)
     
     def get_user_stats(self, user_id: str) -> Dict[str, int]:
         """Get rate limiting stats for a user"""
         current_time = time.time()
-        self._clean_old_requests(current_time)
+        self._clean_user(user_id, current_time)
+        self._clean_global(current_time)
         
         user_count = len(self.user_requests.get(user_id, []))
         global_count = len(self.global_requests)
@@ -95,10 +124,10 @@ class RateLimiter:
     
     def reset_user(self, user_id: str):
         """Reset rate limiting for a specific user"""
-        if user_id in self.user_requests:
-            del self.user_requests[user_id]
+        self.user_requests.pop(user_id, None)
     
     def reset_all(self):
         """Reset all rate limiting data"""
         self.user_requests.clear()
-        self.global_requests.clear() 
\ No newline at end of file
+        self.global_requests.clear()
+        self._records_since_sweep = 0 
\ No newline at end of file
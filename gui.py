@@ -6,34 +6,116 @@ A modern desktop interface for the NakenChat AI Bot using CustomTkinter.
 """
 
 import asyncio
+import logging
 import threading
 import tkinter as tk
 from tkinter import scrolledtext, messagebox
 import customtkinter as ctk
-from datetime import datetime
+from collections import deque
+import copy
+import os
 import sys
-import yaml
+import tempfile
+import time
+from functools import lru_cache
 from pathlib import Path
-import aiohttp
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Parse Ollama responses with orjson when available
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 # Add current directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from main import NakenChatAIBot
 from utils.logger import setup_logger
+from utils.helpers import load_yaml_config
+
+# yaml, aiohttp and the bot itself are imported on first use so the main
+# window comes up without loading them
+
+@lru_cache(maxsize=None)
+def _yaml_codec():
+    """Import PyYAML, preferring the LibYAML dumper when built with it"""
+    import yaml
+    try:
+        from yaml import CSafeDumper as Dumper
+    except ImportError:
+        from yaml import SafeDumper as Dumper
+    return yaml, Dumper
 
 class SettingsDialog:
     """Comprehensive settings dialog for the bot"""
     
-    def __init__(self, parent, config_path="config.yaml"):
+    # Entry rows as (label, attribute, config path, default)
+    BOT_FIELDS = (
+        ("Bot Name:", "bot_name_entry", ('bot', 'name'), 'AI Bot'),
+        ("Trigger Word:", "trigger_entry", ('bot', 'trigger'), 'AI Bot'),
+        ("Username:", "username_entry", ('bot', 'username'), 'AI Bot'),
+        ("Response Delay (seconds):", "delay_entry", ('bot', 'response_delay'), 1.0),
+        ("Max Response Length:", "max_length_entry", ('bot', 'max_response_length'), 200),
+    )
+    CONTEXT_FIELDS = (
+        ("Context Length:", "context_length_entry", ('bot', 'context_length'), 5),
+    )
+    OLLAMA_SERVER_FIELDS = (
+        ("Host:", "ollama_host_entry", ('ollama', 'host'), 'http://localhost'),
+        ("Port:", "ollama_port_entry", ('ollama', 'port'), 11434),
+    )
+    OLLAMA_MODEL_FIELDS = (
+        ("Max Tokens:", "max_tokens_entry", ('ollama', 'max_tokens'), 150),
+        ("Temperature:", "temperature_entry", ('ollama', 'temperature'), 0.7),
+        ("Timeout (seconds):", "timeout_entry", ('ollama', 'timeout'), 30),
+    )
+    CHAT_FIELDS = (
+        ("Host:", "chat_host_entry", ('nakenchat', 'host'), 'localhost'),
+        ("Port:", "chat_port_entry", ('nakenchat', 'port'), 6666),
+        ("Reconnect Delay (seconds):", "reconnect_delay_entry", ('nakenchat', 'reconnect_delay'), 5),
+        ("Max Reconnect Attempts:", "max_reconnect_entry", ('nakenchat', 'max_reconnect_attempts'), 10),
+    )
+    RATE_LIMIT_FIELDS = (
+        ("Max Requests:", "max_requests_entry", ('behavior', 'rate_limit', 'max_requests'), 10),
+        ("Time Window (seconds):", "time_window_entry", ('behavior', 'rate_limit', 'time_window'), 60),
+    )
+    LOG_FILE_FIELDS = (
+        ("Log File Name:", "log_file_entry", ('logging', 'file'), 'bot.log'),
+    )
+    TAB_FIELDS = {
+        "Bot": BOT_FIELDS + CONTEXT_FIELDS,
+        "Ollama": OLLAMA_SERVER_FIELDS + OLLAMA_MODEL_FIELDS,
+        "Chat Server": CHAT_FIELDS,
+        "Behavior": RATE_LIMIT_FIELDS + LOG_FILE_FIELDS,
+    }
+    
+    # Grab retries are 50 ms apart and give up after about two seconds
+    GRAB_RETRY_MS = 50
+    GRAB_MAX_RETRIES = 40
+    
+    def __init__(self, parent, config_path="config.yaml", title_font=None):
         self.parent = parent
         self.config_path = config_path
+        self.title_font = title_font or ctk.CTkFont(size=20, weight="bold")
         self.config = None
+        self._saved_config = None
+        self._flat_config = {}
         self.ollama_models = []
         
-        # Load current config
-        self.load_config()
+        # Model lists keyed by /api/tags URL, reused for models_cache_ttl seconds
+        self._models_cache = {}
+        self.models_cache_ttl = 30.0
+        
+        # Long-lived loop and HTTP session for Ollama requests
+        self._io_loop = asyncio.new_event_loop()
+        threading.Thread(target=self._io_loop.run_forever, daemon=True).start()
+        self._session = None
+        
+        # Pending grab attempt and how many times it has been retried
+        self._grab_after_id = None
+        self._grab_retries = 0
         
         # Create dialog
         self.dialog = ctk.CTkToplevel(parent)
@@ -41,40 +123,166 @@ class SettingsDialog:
         self.dialog.geometry("700x600")
         self.dialog.transient(parent)
         self.dialog.resizable(True, True)
-        
-        # Wait for dialog to be visible before grabbing
-        self.dialog.update_idletasks()
-        self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.hide)
         
         # Setup dialog
         self.setup_dialog()
         
-        # Load Ollama models
-        self.load_ollama_models()
+        # Grab once the populated dialog has been laid out and mapped
+        self._schedule_grab()
+        
+        # Load current config, then Ollama models
+        self.load_config()
     
-    def load_config(self):
-        """Load configuration from file"""
+    def show(self):
+        """Show the dialog again with values reloaded from the config file"""
+        self.load_config()
+        self.dialog.deiconify()
+        self.dialog.lift()
+        self._schedule_grab()
+    
+    def hide(self):
+        """Hide the dialog, keeping its widgets for the next open"""
+        self._cancel_grab()
+        self.dialog.grab_release()
+        self.dialog.withdraw()
+    
+    def close(self):
+        """Close the HTTP session and stop the I/O loop"""
+        async def shutdown():
+            if self._session is not None:
+                await self._session.close()
+            self._io_loop.stop()
+        
         try:
-            with open(self.config_path, 'r') as f:
-                self.config = yaml.safe_load(f)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load config: {e}")
-            self.config = {}
+            asyncio.run_coroutine_threadsafe(shutdown(), self._io_loop).result(timeout=1.0)
+        except Exception:
+            pass
+    
+    def _schedule_grab(self):
+        """Grab the dialog once idle, replacing any grab still pending"""
+        self._cancel_grab()
+        self._grab_retries = 0
+        self._grab_after_id = self.dialog.after_idle(self._grab_dialog)
+    
+    def _cancel_grab(self):
+        """Cancel a pending grab attempt"""
+        if self._grab_after_id is not None:
+            self.dialog.after_cancel(self._grab_after_id)
+            self._grab_after_id = None
+    
+    def _grab_dialog(self):
+        """Make the dialog modal, retrying while it is shown but not yet viewable"""
+        self._grab_after_id = None
+        try:
+            self.dialog.grab_set()
+        except tk.TclError:
+            if (self.dialog.winfo_exists() and self.dialog.state() != "withdrawn"
+                    and self._grab_retries < self.GRAB_MAX_RETRIES):
+                self._grab_retries += 1
+                self._grab_after_id = self.dialog.after(self.GRAB_RETRY_MS, self._grab_dialog)
+    
+    def load_config(self):
+        """Load configuration from file in a separate thread"""
+        self.save_btn.configure(state="disabled")
+        
+        def read_config():
+            try:
+                config = load_yaml_config(self.config_path)
+                self.dialog.after(0, self._apply_config, config)
+            except Exception as e:
+                self.dialog.after(0, self._apply_config, None, e)
+        
+        threading.Thread(target=read_config, daemon=True).start()
+    
+    def _apply_config(self, config, error=None):
+        """Show a freshly loaded config in the UI"""
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to load config: {error}")
+        
+        self.config = config or {}
+        self._saved_config = copy.deepcopy(self.config)
+        self._flat_config = self._flatten(self.config)
+        self.load_values()
+        
+        # Saving after a failed load would replace the file with defaults only
+        if error is None:
+            self.save_btn.configure(state="normal")
+        
+        # Load Ollama models
+        if "Ollama" in self._built_tabs:
+            self.load_ollama_models()
     
     def save_config(self):
-        """Save configuration to file"""
+        """Save configuration to file, writing it in a separate thread"""
         try:
+            # Tabs never shown keep their loaded values; build any whose values
+            # are missing from the config so their defaults get written too
+            for name, fields in self.TAB_FIELDS.items():
+                if name not in self._built_tabs and any(
+                    path not in self._flat_config for _, _, path, _ in fields
+                ):
+                    self._build_tab(name)
+            
             # Update config with current values
             self.update_config_from_ui()
             
-            with open(self.config_path, 'w') as f:
-                yaml.dump(self.config, f, default_flow_style=False, indent=2)
+            if self.config == self._saved_config:
+                messagebox.showinfo("No Changes", "Settings are already saved.")
+                return True
             
-            messagebox.showinfo("Success", "Settings saved successfully!")
-            return True
+            saved = copy.deepcopy(self.config)
+            yaml, dumper = _yaml_codec()
+            data = yaml.dump(self.config, Dumper=dumper, default_flow_style=False, indent=2, sort_keys=False)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save config: {e}")
             return False
+        
+        def write_config():
+            # Write beside the config and swap it in, so an interrupted save
+            # never leaves a truncated config.yaml behind; the temp name is
+            # unique so no other writer can touch the same file
+            config_path = Path(self.config_path)
+            tmp_path = None
+            try:
+                with tempfile.NamedTemporaryFile(
+                    'w', dir=config_path.parent, prefix=f"{config_path.name}.",
+                    suffix=".tmp", delete=False
+                ) as f:
+                    tmp_path = f.name
+                    f.write(data)
+                
+                # Temp files are private; keep the config's own permissions
+                try:
+                    os.chmod(tmp_path, config_path.stat().st_mode & 0o7777)
+                except FileNotFoundError:
+                    pass
+                
+                os.replace(tmp_path, config_path)
+                self.dialog.after(0, self._config_saved, saved)
+            except Exception as e:
+                if tmp_path is not None:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+                self.dialog.after(0, self._save_failed, e)
+        
+        # One write at a time; re-enabled once this one has finished
+        self.save_btn.configure(state="disabled")
+        threading.Thread(target=write_config, daemon=True).start()
+        return True
+    
+    def _config_saved(self, saved):
+        """Record the config that was just written to disk"""
+        self._saved_config = saved
+        self.save_btn.configure(state="normal")
+        messagebox.showinfo("Success", "Settings saved successfully!")
+    
+    def _save_failed(self, error):
+        """Report a failed write and allow saving again"""
+        self.save_btn.configure(state="normal")
+        messagebox.showerror("Error", f"Failed to save config: {error}")
     
     def setup_dialog(self):
         """Setup the settings dialog"""
@@ -83,56 +291,59 @@ class SettingsDialog:
         self.dialog.grid_rowconfigure(1, weight=1)
         
         # Title
-        title = ctk.CTkLabel(self.dialog, text="Bot Settings", font=ctk.CTkFont(size=20, weight="bold"))
+        title = ctk.CTkLabel(self.dialog, text="Bot Settings", font=self.title_font)
         title.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="w")
         
         # Create notebook for tabs
-        self.notebook = ctk.CTkTabview(self.dialog)
+        self.notebook = ctk.CTkTabview(self.dialog, command=self._on_tab_change)
         self.notebook.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
         
-        # Add tabs
-        self.setup_bot_tab()
-        self.setup_ollama_tab()
-        self.setup_chat_tab()
-        self.setup_behavior_tab()
+        # Add tabs, building each one's widgets the first time it is shown
+        self._tab_builders = {
+            "Bot": self.setup_bot_tab,
+            "Ollama": self.setup_ollama_tab,
+            "Chat Server": self.setup_chat_tab,
+            "Behavior": self.setup_behavior_tab,
+        }
+        self._built_tabs = set()
+        for name in self._tab_builders:
+            self.notebook.add(name)
+        self._build_tab(self.notebook.get())
         
         # Buttons
         self.setup_buttons()
     
+    def _on_tab_change(self):
+        """Build the newly selected tab if it hasn't been shown yet"""
+        self._build_tab(self.notebook.get())
+    
+    def _build_tab(self, name):
+        """Create a tab's widgets and fill them from the loaded config"""
+        if name in self._built_tabs:
+            return
+        
+        self._tab_builders[name]()
+        self._built_tabs.add(name)
+        
+        if self.config is not None:
+            self.load_values({name})
+            if name == "Ollama":
+                self.load_ollama_models()
+    
+    def _build_entry_rows(self, parent, fields, start_row=0):
+        """Create a label and entry row for each (label, attr, path, default) field"""
+        for row, (label, attr, _, _) in enumerate(fields, start_row):
+            ctk.CTkLabel(parent, text=label).grid(row=row, column=0, padx=10, pady=5, sticky="w")
+            entry = ctk.CTkEntry(parent)
+            entry.grid(row=row, column=1, padx=10, pady=5, sticky="ew")
+            setattr(self, attr, entry)
+    
     def setup_bot_tab(self):
         """Setup bot configuration tab"""
-        bot_tab = self.notebook.add("Bot")
+        bot_tab = self.notebook.tab("Bot")
         bot_tab.grid_columnconfigure(1, weight=1)
         
-        # Bot name
-        ctk.CTkLabel(bot_tab, text="Bot Name:").grid(row=0, column=0, padx=10, pady=5, sticky="w")
-        self.bot_name_entry = ctk.CTkEntry(bot_tab)
-        self.bot_name_entry.grid(row=0, column=1, padx=10, pady=5, sticky="ew")
-        self.bot_name_entry.insert(0, self.config.get('bot', {}).get('name', 'AI Bot'))
-        
-        # Trigger word
-        ctk.CTkLabel(bot_tab, text="Trigger Word:").grid(row=1, column=0, padx=10, pady=5, sticky="w")
-        self.trigger_entry = ctk.CTkEntry(bot_tab)
-        self.trigger_entry.grid(row=1, column=1, padx=10, pady=5, sticky="ew")
-        self.trigger_entry.insert(0, self.config.get('bot', {}).get('trigger', 'AI Bot'))
-        
-        # Username
-        ctk.CTkLabel(bot_tab, text="Username:").grid(row=2, column=0, padx=10, pady=5, sticky="w")
-        self.username_entry = ctk.CTkEntry(bot_tab)
-        self.username_entry.grid(row=2, column=1, padx=10, pady=5, sticky="ew")
-        self.username_entry.insert(0, self.config.get('bot', {}).get('username', 'AI Bot'))
-        
-        # Response delay
-        ctk.CTkLabel(bot_tab, text="Response Delay (seconds):").grid(row=3, column=0, padx=10, pady=5, sticky="w")
-        self.delay_entry = ctk.CTkEntry(bot_tab)
-        self.delay_entry.grid(row=3, column=1, padx=10, pady=5, sticky="ew")
-        self.delay_entry.insert(0, str(self.config.get('bot', {}).get('response_delay', 1.0)))
-        
-        # Max response length
-        ctk.CTkLabel(bot_tab, text="Max Response Length:").grid(row=4, column=0, padx=10, pady=5, sticky="w")
-        self.max_length_entry = ctk.CTkEntry(bot_tab)
-        self.max_length_entry.grid(row=4, column=1, padx=10, pady=5, sticky="ew")
-        self.max_length_entry.insert(0, str(self.config.get('bot', {}).get('max_response_length', 200)))
+        self._build_entry_rows(bot_tab, self.BOT_FIELDS)
         
         # Context settings
         ctk.CTkLabel(bot_tab, text="Context Settings:").grid(row=5, column=0, padx=10, pady=5, sticky="w")
@@ -141,31 +352,18 @@ class SettingsDialog:
         context_frame.grid(row=6, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
         context_frame.grid_columnconfigure(1, weight=1)
         
-        self.enable_context_var = tk.BooleanVar(value=self.config.get('bot', {}).get('enable_context', True))
-        context_check = ctk.CTkCheckBox(context_frame, text="Enable Context", variable=self.enable_context_var)
-        context_check.grid(row=0, column=0, padx=10, pady=5, sticky="w")
+        self.context_check = ctk.CTkCheckBox(context_frame, text="Enable Context")
+        self.context_check.grid(row=0, column=0, padx=10, pady=5, sticky="w")
         
-        ctk.CTkLabel(context_frame, text="Context Length:").grid(row=1, column=0, padx=10, pady=5, sticky="w")
-        self.context_length_entry = ctk.CTkEntry(context_frame)
-        self.context_length_entry.grid(row=1, column=1, padx=10, pady=5, sticky="ew")
-        self.context_length_entry.insert(0, str(self.config.get('bot', {}).get('context_length', 5)))
+        self._build_entry_rows(context_frame, self.CONTEXT_FIELDS, start_row=1)
     
     def setup_ollama_tab(self):
         """Setup Ollama configuration tab"""
-        ollama_tab = self.notebook.add("Ollama")
+        ollama_tab = self.notebook.tab("Ollama")
         ollama_tab.grid_columnconfigure(1, weight=1)
         
-        # Host
-        ctk.CTkLabel(ollama_tab, text="Host:").grid(row=0, column=0, padx=10, pady=5, sticky="w")
-        self.ollama_host_entry = ctk.CTkEntry(ollama_tab)
-        self.ollama_host_entry.grid(row=0, column=1, padx=10, pady=5, sticky="ew")
-        self.ollama_host_entry.insert(0, self.config.get('ollama', {}).get('host', 'http://localhost'))
-        
-        # Port
-        ctk.CTkLabel(ollama_tab, text="Port:").grid(row=1, column=0, padx=10, pady=5, sticky="w")
-        self.ollama_port_entry = ctk.CTkEntry(ollama_tab)
-        self.ollama_port_entry.grid(row=1, column=1, padx=10, pady=5, sticky="ew")
-        self.ollama_port_entry.insert(0, str(self.config.get('ollama', {}).get('port', 11434)))
+        # Host and port
+        self._build_entry_rows(ollama_tab, self.OLLAMA_SERVER_FIELDS)
         
         # Model selection
         ctk.CTkLabel(ollama_tab, text="Model:").grid(row=2, column=0, padx=10, pady=5, sticky="w")
@@ -174,7 +372,7 @@ class SettingsDialog:
         model_frame.grid(row=3, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
         model_frame.grid_columnconfigure(0, weight=1)
         
-        self.model_var = tk.StringVar(value=self.config.get('ollama', {}).get('model', 'llama2'))
+        self.model_var = tk.StringVar()
         self.model_menu = ctk.CTkOptionMenu(model_frame, variable=self.model_var, values=["Loading..."])
         self.model_menu.grid(row=0, column=0, padx=10, pady=5, sticky="ew")
         
@@ -182,58 +380,23 @@ class SettingsDialog:
         refresh_btn.grid(row=0, column=1, padx=10, pady=5)
         
         # Model parameters
-        ctk.CTkLabel(ollama_tab, text="Max Tokens:").grid(row=4, column=0, padx=10, pady=5, sticky="w")
-        self.max_tokens_entry = ctk.CTkEntry(ollama_tab)
-        self.max_tokens_entry.grid(row=4, column=1, padx=10, pady=5, sticky="ew")
-        self.max_tokens_entry.insert(0, str(self.config.get('ollama', {}).get('max_tokens', 150)))
-        
-        ctk.CTkLabel(ollama_tab, text="Temperature:").grid(row=5, column=0, padx=10, pady=5, sticky="w")
-        self.temperature_entry = ctk.CTkEntry(ollama_tab)
-        self.temperature_entry.grid(row=5, column=1, padx=10, pady=5, sticky="ew")
-        self.temperature_entry.insert(0, str(self.config.get('ollama', {}).get('temperature', 0.7)))
-        
-        ctk.CTkLabel(ollama_tab, text="Timeout (seconds):").grid(row=6, column=0, padx=10, pady=5, sticky="w")
-        self.timeout_entry = ctk.CTkEntry(ollama_tab)
-        self.timeout_entry.grid(row=6, column=1, padx=10, pady=5, sticky="ew")
-        self.timeout_entry.insert(0, str(self.config.get('ollama', {}).get('timeout', 30)))
+        self._build_entry_rows(ollama_tab, self.OLLAMA_MODEL_FIELDS, start_row=4)
         
         # System prompt
         ctk.CTkLabel(ollama_tab, text="System Prompt:").grid(row=7, column=0, padx=10, pady=5, sticky="w")
         self.system_prompt_text = ctk.CTkTextbox(ollama_tab, height=100)
         self.system_prompt_text.grid(row=8, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
-        self.system_prompt_text.insert("1.0", self.config.get('ollama', {}).get('system_prompt', ''))
     
     def setup_chat_tab(self):
         """Setup NakenChat configuration tab"""
-        chat_tab = self.notebook.add("Chat Server")
+        chat_tab = self.notebook.tab("Chat Server")
         chat_tab.grid_columnconfigure(1, weight=1)
         
-        # Host
-        ctk.CTkLabel(chat_tab, text="Host:").grid(row=0, column=0, padx=10, pady=5, sticky="w")
-        self.chat_host_entry = ctk.CTkEntry(chat_tab)
-        self.chat_host_entry.grid(row=0, column=1, padx=10, pady=5, sticky="ew")
-        self.chat_host_entry.insert(0, self.config.get('nakenchat', {}).get('host', 'localhost'))
-        
-        # Port
-        ctk.CTkLabel(chat_tab, text="Port:").grid(row=1, column=0, padx=10, pady=5, sticky="w")
-        self.chat_port_entry = ctk.CTkEntry(chat_tab)
-        self.chat_port_entry.grid(row=1, column=1, padx=10, pady=5, sticky="ew")
-        self.chat_port_entry.insert(0, str(self.config.get('nakenchat', {}).get('port', 6666)))
-        
-        # Reconnect settings
-        ctk.CTkLabel(chat_tab, text="Reconnect Delay (seconds):").grid(row=2, column=0, padx=10, pady=5, sticky="w")
-        self.reconnect_delay_entry = ctk.CTkEntry(chat_tab)
-        self.reconnect_delay_entry.grid(row=2, column=1, padx=10, pady=5, sticky="ew")
-        self.reconnect_delay_entry.insert(0, str(self.config.get('nakenchat', {}).get('reconnect_delay', 5)))
-        
-        ctk.CTkLabel(chat_tab, text="Max Reconnect Attempts:").grid(row=3, column=0, padx=10, pady=5, sticky="w")
-        self.max_reconnect_entry = ctk.CTkEntry(chat_tab)
-        self.max_reconnect_entry.grid(row=3, column=1, padx=10, pady=5, sticky="ew")
-        self.max_reconnect_entry.insert(0, str(self.config.get('nakenchat', {}).get('max_reconnect_attempts', 10)))
+        self._build_entry_rows(chat_tab, self.CHAT_FIELDS)
     
     def setup_behavior_tab(self):
         """Setup behavior configuration tab"""
-        behavior_tab = self.notebook.add("Behavior")
+        behavior_tab = self.notebook.tab("Behavior")
         behavior_tab.grid_columnconfigure(1, weight=1)
         
         # Rate limiting
@@ -243,51 +406,35 @@ class SettingsDialog:
         rate_frame.grid(row=1, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
         rate_frame.grid_columnconfigure(1, weight=1)
         
-        self.enable_rate_limit_var = tk.BooleanVar(value=self.config.get('behavior', {}).get('rate_limit', {}).get('enabled', True))
-        rate_check = ctk.CTkCheckBox(rate_frame, text="Enable Rate Limiting", variable=self.enable_rate_limit_var)
-        rate_check.grid(row=0, column=0, padx=10, pady=5, sticky="w")
+        self.rate_limit_check = ctk.CTkCheckBox(rate_frame, text="Enable Rate Limiting")
+        self.rate_limit_check.grid(row=0, column=0, padx=10, pady=5, sticky="w")
         
-        ctk.CTkLabel(rate_frame, text="Max Requests:").grid(row=1, column=0, padx=10, pady=5, sticky="w")
-        self.max_requests_entry = ctk.CTkEntry(rate_frame)
-        self.max_requests_entry.grid(row=1, column=1, padx=10, pady=5, sticky="ew")
-        self.max_requests_entry.insert(0, str(self.config.get('behavior', {}).get('rate_limit', {}).get('max_requests', 10)))
-        
-        ctk.CTkLabel(rate_frame, text="Time Window (seconds):").grid(row=2, column=0, padx=10, pady=5, sticky="w")
-        self.time_window_entry = ctk.CTkEntry(rate_frame)
-        self.time_window_entry.grid(row=2, column=1, padx=10, pady=5, sticky="ew")
-        self.time_window_entry.insert(0, str(self.config.get('behavior', {}).get('rate_limit', {}).get('time_window', 60)))
+        self._build_entry_rows(rate_frame, self.RATE_LIMIT_FIELDS, start_row=1)
         
         # Commands
-        self.enable_commands_var = tk.BooleanVar(value=self.config.get('behavior', {}).get('enable_commands', True))
-        commands_check = ctk.CTkCheckBox(behavior_tab, text="Enable Bot Commands", variable=self.enable_commands_var)
-        commands_check.grid(row=2, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+        self.commands_check = ctk.CTkCheckBox(behavior_tab, text="Enable Bot Commands")
+        self.commands_check.grid(row=2, column=0, columnspan=2, padx=10, pady=5, sticky="w")
         
         # User tracking
-        self.enable_user_tracking_var = tk.BooleanVar(value=self.config.get('behavior', {}).get('user_tracking', True))
-        tracking_check = ctk.CTkCheckBox(behavior_tab, text="Enable User Tracking", variable=self.enable_user_tracking_var)
-        tracking_check.grid(row=3, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+        self.tracking_check = ctk.CTkCheckBox(behavior_tab, text="Enable User Tracking")
+        self.tracking_check.grid(row=3, column=0, columnspan=2, padx=10, pady=5, sticky="w")
         
         # Logging
         ctk.CTkLabel(behavior_tab, text="Logging Level:").grid(row=4, column=0, padx=10, pady=5, sticky="w")
-        self.log_level_var = tk.StringVar(value=self.config.get('logging', {}).get('level', 'INFO'))
+        self.log_level_var = tk.StringVar()
         log_level_menu = ctk.CTkOptionMenu(behavior_tab, variable=self.log_level_var, 
                                           values=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
         log_level_menu.grid(row=4, column=1, padx=10, pady=5, sticky="ew")
         
-        self.enable_console_log_var = tk.BooleanVar(value=self.config.get('logging', {}).get('console', True))
-        console_check = ctk.CTkCheckBox(behavior_tab, text="Console Logging", variable=self.enable_console_log_var)
-        console_check.grid(row=5, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+        self.console_log_check = ctk.CTkCheckBox(behavior_tab, text="Console Logging")
+        self.console_log_check.grid(row=5, column=0, columnspan=2, padx=10, pady=5, sticky="w")
         
         # File logging enable/disable
-        self.enable_file_log_var = tk.BooleanVar(value=self.config.get('logging', {}).get('file_enabled', True))
-        file_check = ctk.CTkCheckBox(behavior_tab, text="File Logging", variable=self.enable_file_log_var)
-        file_check.grid(row=6, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+        self.file_log_check = ctk.CTkCheckBox(behavior_tab, text="File Logging")
+        self.file_log_check.grid(row=6, column=0, columnspan=2, padx=10, pady=5, sticky="w")
         
         # Log file name entry
-        ctk.CTkLabel(behavior_tab, text="Log File Name:").grid(row=7, column=0, padx=10, pady=5, sticky="w")
-        self.log_file_entry = ctk.CTkEntry(behavior_tab)
-        self.log_file_entry.grid(row=7, column=1, padx=10, pady=5, sticky="ew")
-        self.log_file_entry.insert(0, str(self.config.get('logging', {}).get('file', 'bot.log')))
+        self._build_entry_rows(behavior_tab, self.LOG_FILE_FIELDS, start_row=7)
     
     def setup_buttons(self):
         """Setup dialog buttons"""
@@ -297,139 +444,222 @@ class SettingsDialog:
         button_frame.grid_columnconfigure(1, weight=1)
         button_frame.grid_columnconfigure(2, weight=1)
         
-        save_btn = ctk.CTkButton(button_frame, text="Save", command=self.save_config)
-        save_btn.grid(row=0, column=0, padx=10, pady=10)
+        self.save_btn = ctk.CTkButton(button_frame, text="Save", command=self.save_config)
+        self.save_btn.grid(row=0, column=0, padx=10, pady=10)
         
-        cancel_btn = ctk.CTkButton(button_frame, text="Cancel", command=self.dialog.destroy)
+        cancel_btn = ctk.CTkButton(button_frame, text="Cancel", command=self.hide)
         cancel_btn.grid(row=0, column=1, padx=10, pady=10)
         
         test_btn = ctk.CTkButton(button_frame, text="Test Connection", command=self.test_connection)
         test_btn.grid(row=0, column=2, padx=10, pady=10)
     
-    async def get_ollama_models(self):
-        """Get available Ollama models"""
-        try:
+    def load_values(self, tabs=None):
+        """Fill the given tabs (default: every built tab) with the current config values"""
+        if tabs is None:
+            tabs = self._built_tabs
+        
+        for tab in tabs:
+            for _, attr, path, default in self.TAB_FIELDS[tab]:
+                self._set_entry(getattr(self, attr), self._config_value(path, default))
+        
+        if "Bot" in tabs:
+            self._set_check(self.context_check, self._config_value(('bot', 'enable_context'), True))
+        
+        if "Ollama" in tabs:
+            self.model_var.set(self._config_value(('ollama', 'model'), 'llama2'))
+            self.system_prompt_text.delete("1.0", "end")
+            self.system_prompt_text.insert("1.0", self._config_value(('ollama', 'system_prompt'), ''))
+        
+        if "Behavior" in tabs:
+            self._set_check(self.rate_limit_check, self._config_value(('behavior', 'rate_limit', 'enabled'), True))
+            self._set_check(self.commands_check, self._config_value(('behavior', 'enable_commands'), True))
+            self._set_check(self.tracking_check, self._config_value(('behavior', 'user_tracking'), True))
+            
+            self.log_level_var.set(self._config_value(('logging', 'level'), 'INFO'))
+            self._set_check(self.console_log_check, self._config_value(('logging', 'console'), True))
+            self._set_check(self.file_log_check, self._config_value(('logging', 'file_enabled'), True))
+    
+    def _config_value(self, path, default):
+        """Look up a config value by its key path"""
+        return self._flat_config.get(path, default)
+    
+    @classmethod
+    def _flatten(cls, config, prefix=()):
+        """Map each leaf of a nested config to its key path, e.g. ('bot', 'name')"""
+        flat = {}
+        for key, value in config.items():
+            path = prefix + (key,)
+            if isinstance(value, dict):
+                flat.update(cls._flatten(value, path))
+            else:
+                flat[path] = value
+        return flat
+    
+    @staticmethod
+    def _set_check(check, value):
+        """Tick or clear a checkbox"""
+        if value:
+            check.select()
+        else:
+            check.deselect()
+    
+    @staticmethod
+    def _set_entry(entry, value):
+        """Replace the text of an entry widget"""
+        entry.delete(0, "end")
+        entry.insert(0, str(value))
+    
+    async def _get_session(self):
+        """Get the shared HTTP session, creating it on the I/O loop"""
+        if self._session is None or self._session.closed:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=4, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._session
+    
+    def _run_io(self, coro, callback):
+        """Run a coroutine on the I/O loop, passing its future to callback on the Tk thread"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._io_loop)
+        future.add_done_callback(lambda f: self.dialog.after(0, callback, f))
+    
+    def _tags_url(self):
+        """Get the Ollama /api/tags URL from the host and port entries"""
+        if "Ollama" in self._built_tabs:
             host = self.ollama_host_entry.get()
             port = self.ollama_port_entry.get()
-            url = f"{host}:{port}/api/tags"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return [model['name'] for model in data.get('models', [])]
-                    else:
-                        return []
+        else:
+            host = self._config_value(('ollama', 'host'), 'http://localhost')
+            port = self._config_value(('ollama', 'port'), 11434)
+        return f"{host}:{port}/api/tags"
+    
+    async def get_ollama_models(self, url):
+        """Get available Ollama models"""
+        try:
+            session = await self._get_session()
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = await response.json(loads=_json_loads)
+                    return [model['name'] for model in data.get('models', [])]
+                else:
+                    return []
         except Exception as e:
             print(f"Error getting Ollama models: {e}")
             return []
     
     def load_ollama_models(self):
-        """Load Ollama models in a separate thread"""
-        def load_models():
-            try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                models = loop.run_until_complete(self.get_ollama_models())
-                loop.close()
-                
-                if models:
-                    self.ollama_models = models
-                    self.model_menu.configure(values=models)
-                    if self.model_var.get() not in models and models:
-                        self.model_var.set(models[0])
-                else:
-                    self.model_menu.configure(values=["No models found"])
-            except Exception as e:
-                self.model_menu.configure(values=["Error loading models"])
-                print(f"Error loading models: {e}")
+        """Load Ollama models on the I/O loop, reusing a recent list from the same server"""
+        url = self._tags_url()
+        cached = self._models_cache.get(url)
+        if cached and time.monotonic() - cached[1] < self.models_cache_ttl:
+            self._show_models(cached[0])
+            return
         
-        threading.Thread(target=load_models, daemon=True).start()
+        self._run_io(self.get_ollama_models(url), lambda future: self._apply_models(future, url))
     
-    def update_config_from_ui(self):
-        """Update config dictionary with current UI values"""
-        # Bot settings
-        if 'bot' not in self.config:
-            self.config['bot'] = {}
+    def _apply_models(self, future, url):
+        """Cache and show the loaded Ollama models"""
+        try:
+            models = future.result()
+        except Exception as e:
+            self.model_menu.configure(values=["Error loading models"])
+            print(f"Error loading models: {e}")
+            return
         
-        self.config['bot']['name'] = self.bot_name_entry.get()
-        self.config['bot']['trigger'] = self.trigger_entry.get()
-        self.config['bot']['username'] = self.username_entry.get()
-        self.config['bot']['response_delay'] = float(self.delay_entry.get())
-        self.config['bot']['max_response_length'] = int(self.max_length_entry.get())
-        self.config['bot']['enable_context'] = self.enable_context_var.get()
-        self.config['bot']['context_length'] = int(self.context_length_entry.get())
+        if models:
+            self._models_cache[url] = (models, time.monotonic())
+        self._show_models(models)
+    
+    def _show_models(self, models):
+        """Show a list of Ollama models in the model menu"""
+        if models:
+            self.ollama_models = models
+            self.model_menu.configure(values=models)
+            if self.model_var.get() not in models:
+                self.model_var.set(models[0])
+        else:
+            self.model_menu.configure(values=["No models found"])
+    
+    def update_config_from_ui(self):
+        """Update config dictionary with the values of every built tab"""
+        built = self._built_tabs
+        number = self._to_number
         
+        # Bot settings
+        if "Bot" in built:
+            bot = self.config.setdefault('bot', {})
+            bot['name'] = self.bot_name_entry.get()
+            bot['trigger'] = self.trigger_entry.get()
+            bot['username'] = self.username_entry.get()
+            bot['response_delay'] = number(self.delay_entry, float, bot.get('response_delay', 1.0))
+            bot['max_response_length'] = number(self.max_length_entry, int, bot.get('max_response_length', 200))
+            bot['enable_context'] = bool(self.context_check.get())
+            bot['context_length'] = number(self.context_length_entry, int, bot.get('context_length', 5))
+            
         # Ollama settings
-        if 'ollama' not in self.config:
-            self.config['ollama'] = {}
-        
-        self.config['ollama']['host'] = self.ollama_host_entry.get()
-        self.config['ollama']['port'] = int(self.ollama_port_entry.get())
-        self.config['ollama']['model'] = self.model_var.get()
-        self.config['ollama']['max_tokens'] = int(self.max_tokens_entry.get())
-        self.config['ollama']['temperature'] = float(self.temperature_entry.get())
-        self.config['ollama']['timeout'] = int(self.timeout_entry.get())
-        self.config['ollama']['system_prompt'] = self.system_prompt_text.get("1.0", "end-1c")
-        
+        if "Ollama" in built:
+            ollama = self.config.setdefault('ollama', {})
+            ollama['host'] = self.ollama_host_entry.get()
+            ollama['port'] = number(self.ollama_port_entry, int, ollama.get('port', 11434))
+            ollama['model'] = self.model_var.get()
+            ollama['max_tokens'] = number(self.max_tokens_entry, int, ollama.get('max_tokens', 150))
+            ollama['temperature'] = number(self.temperature_entry, float, ollama.get('temperature', 0.7))
+            ollama['timeout'] = number(self.timeout_entry, int, ollama.get('timeout', 30))
+            ollama['system_prompt'] = self.system_prompt_text.get("1.0", "end-1c")
+            
         # Chat settings
-        if 'nakenchat' not in self.config:
-            self.config['nakenchat'] = {}
-        
-        self.config['nakenchat']['host'] = self.chat_host_entry.get()
-        self.config['nakenchat']['port'] = int(self.chat_port_entry.get())
-        self.config['nakenchat']['reconnect_delay'] = int(self.reconnect_delay_entry.get())
-        self.config['nakenchat']['max_reconnect_attempts'] = int(self.max_reconnect_entry.get())
-        
-        # Behavior settings
-        if 'behavior' not in self.config:
-            self.config['behavior'] = {}
-        if 'rate_limit' not in self.config['behavior']:
-            self.config['behavior']['rate_limit'] = {}
-        
-        self.config['behavior']['rate_limit']['enabled'] = self.enable_rate_limit_var.get()
-        self.config['behavior']['rate_limit']['max_requests'] = int(self.max_requests_entry.get())
-        self.config['behavior']['rate_limit']['time_window'] = int(self.time_window_entry.get())
-        self.config['behavior']['enable_commands'] = self.enable_commands_var.get()
-        self.config['behavior']['user_tracking'] = self.enable_user_tracking_var.get()
-        
-        # Logging settings
-        if 'logging' not in self.config:
-            self.config['logging'] = {}
-        
-        self.config['logging']['level'] = self.log_level_var.get()
-        self.config['logging']['console'] = self.enable_console_log_var.get()
-        self.config['logging']['file_enabled'] = self.enable_file_log_var.get()
-        self.config['logging']['file'] = self.log_file_entry.get()
+        if "Chat Server" in built:
+            chat = self.config.setdefault('nakenchat', {})
+            chat['host'] = self.chat_host_entry.get()
+            chat['port'] = number(self.chat_port_entry, int, chat.get('port', 6666))
+            chat['reconnect_delay'] = number(self.reconnect_delay_entry, int, chat.get('reconnect_delay', 5))
+            chat['max_reconnect_attempts'] = number(self.max_reconnect_entry, int, chat.get('max_reconnect_attempts', 10))
+            
+        if "Behavior" in built:
+            # Behavior settings
+            behavior = self.config.setdefault('behavior', {})
+            rate_limit = behavior.setdefault('rate_limit', {})
+            rate_limit['enabled'] = bool(self.rate_limit_check.get())
+            rate_limit['max_requests'] = number(self.max_requests_entry, int, rate_limit.get('max_requests', 10))
+            rate_limit['time_window'] = number(self.time_window_entry, int, rate_limit.get('time_window', 60))
+            behavior['enable_commands'] = bool(self.commands_check.get())
+            behavior['user_tracking'] = bool(self.tracking_check.get())
+            
+            # Logging settings
+            logging_config = self.config.setdefault('logging', {})
+            logging_config['level'] = self.log_level_var.get()
+            logging_config['console'] = bool(self.console_log_check.get())
+            logging_config['file_enabled'] = bool(self.file_log_check.get())
+            logging_config['file'] = self.log_file_entry.get()
+    
+    @staticmethod
+    def _to_number(entry, cast, default):
+        """Convert an entry's text with cast, keeping default when it is blank"""
+        text = entry.get().strip()
+        return cast(text) if text else default
     
     def test_connection(self):
         """Test Ollama connection"""
-        def test():
-            try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                host = self.ollama_host_entry.get()
-                port = self.ollama_port_entry.get()
-                url = f"{host}:{port}/api/tags"
-                
-                async def test_ollama():
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(url) as response:
-                            return response.status == 200
-                
-                success = loop.run_until_complete(test_ollama())
-                loop.close()
-                
-                if success:
-                    messagebox.showinfo("Success", "Ollama connection successful!")
-                else:
-                    messagebox.showerror("Error", "Failed to connect to Ollama")
-                    
-            except Exception as e:
-                messagebox.showerror("Error", f"Connection test failed: {e}")
+        url = self._tags_url()
+        
+        async def test_ollama():
+            # HEAD skips the model list body; 405 still means the server is up
+            session = await self._get_session()
+            async with session.head(url) as response:
+                return response.status in (200, 405)
         
-        threading.Thread(target=test, daemon=True).start()
+        self._run_io(test_ollama(), self._show_test_result)
+    
+    def _show_test_result(self, future):
+        """Report the outcome of a connection test"""
+        try:
+            if future.result():
+                messagebox.showinfo("Success", "Ollama connection successful!")
+            else:
+                messagebox.showerror("Error", "Failed to connect to Ollama")
+        except Exception as e:
+            messagebox.showerror("Error", f"Connection test failed: {e}")
 
 class BotGUI:
     """Modern GUI for NakenChat AI Bot"""
@@ -445,16 +675,55 @@ class BotGUI:
         self.root.geometry("1000x700")
         self.root.minsize(800, 600)
         
+        # Shared fonts, keyed by (size, weight)
+        self._fonts = {
+            (20, "bold"): ctk.CTkFont(size=20, weight="bold"),
+            (18, "bold"): ctk.CTkFont(size=18, weight="bold"),
+            (16, "bold"): ctk.CTkFont(size=16, weight="bold"),
+            (12, None): ctk.CTkFont(size=12),
+        }
+        
         # Bot instance
         self.bot = None
-        self.bot_thread = None
         self.running = False
         
+        # One event loop runs every bot start and stop for the GUI's lifetime
+        self.bot_loop = asyncio.new_event_loop()
+        threading.Thread(target=self.bot_loop.run_forever, daemon=True).start()
+        
+        # Pending bot.stop() future, and the fallback timer used when closing
+        self._stop_future = None
+        self._close_after_id = None
+        self._destroyed = False
+        
+        # Settings dialog, built on first open
+        self._settings = None
+        
+        # Number of lines currently shown in the logs view
+        self._line_count = 0
+        self.max_log_lines = 1000
+        
+        # (epoch second, message) pairs waiting for the next flush
+        self._pending = deque()
+        self.log_flush_interval = 50  # milliseconds
+        self.log_flush_max_lines = 256
+        self.log_flush_threshold = 8
+        self._early_flush_scheduled = False
+        self._flush_after_id = None
+        
+        # (epoch second, "HH:MM:SS") of the last log timestamp
+        self._log_stamp = (-1, "")
+        
+        # Last text written to the stats box
+        self._last_stats = None
+        self._stats_after_id = None
+        
         # GUI elements
         self.setup_gui()
         
         # Custom logger for GUI
         self.setup_gui_logger()
+        self._flush_after_id = self.root.after(self.log_flush_interval, self._flush_logs)
         
         # Bind window close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -478,10 +747,10 @@ class BotGUI:
         """Setup the left sidebar"""
         sidebar = ctk.CTkFrame(self.root, width=250)
         sidebar.grid(row=0, column=0, rowspan=2, sticky="nsew", padx=10, pady=10)
-        sidebar.grid_rowconfigure(4, weight=1)
+        sidebar.grid_rowconfigure(5, weight=1)
         
         # Title
-        title = ctk.CTkLabel(sidebar, text="NakenChat AI Bot", font=ctk.CTkFont(size=20, weight="bold"))
+        title = ctk.CTkLabel(sidebar, text="NakenChat AI Bot", font=self._fonts[(20, "bold")])
         title.grid(row=0, column=0, padx=20, pady=(20, 10))
         
         # Control buttons
@@ -495,20 +764,16 @@ class BotGUI:
         settings_btn = ctk.CTkButton(sidebar, text="Settings", command=self.open_settings, height=35)
         settings_btn.grid(row=3, column=0, padx=20, pady=10, sticky="ew")
         
-        # Stats frame
-        stats_frame = ctk.CTkFrame(sidebar)
-        stats_frame.grid(row=4, column=0, padx=20, pady=20, sticky="nsew")
-        stats_frame.grid_columnconfigure(0, weight=1)
-        
-        stats_label = ctk.CTkLabel(stats_frame, text="Statistics", font=ctk.CTkFont(size=16, weight="bold"))
-        stats_label.grid(row=0, column=0, padx=15, pady=(15, 10))
+        # Stats, gridded straight onto the sidebar
+        stats_label = ctk.CTkLabel(sidebar, text="Statistics", font=self._fonts[(16, "bold")])
+        stats_label.grid(row=4, column=0, padx=20, pady=(20, 10))
         
-        self.stats_text = ctk.CTkTextbox(stats_frame, height=200, width=200)
-        self.stats_text.grid(row=1, column=0, padx=15, pady=(0, 15), sticky="ew")
+        self.stats_text = ctk.CTkTextbox(sidebar, height=200, width=200)
+        self.stats_text.grid(row=5, column=0, padx=20, pady=(0, 20), sticky="new")
         
         # Clear logs button
         clear_btn = ctk.CTkButton(sidebar, text="Clear Logs", command=self.clear_logs, height=35)
-        clear_btn.grid(row=5, column=0, padx=20, pady=10, sticky="ew")
+        clear_btn.grid(row=6, column=0, padx=20, pady=10, sticky="ew")
     
     def setup_main_content(self):
         """Setup the main content area"""
@@ -518,13 +783,16 @@ class BotGUI:
         main_frame.grid_rowconfigure(1, weight=1)
         
         # Logs label
-        logs_label = ctk.CTkLabel(main_frame, text="Bot Logs", font=ctk.CTkFont(size=18, weight="bold"))
+        logs_label = ctk.CTkLabel(main_frame, text="Bot Logs", font=self._fonts[(18, "bold")])
         logs_label.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="w")
         
         # Logs text area
-        self.logs_text = ctk.CTkTextbox(main_frame, font=ctk.CTkFont(size=12))
+        self.logs_text = ctk.CTkTextbox(main_frame, font=self._fonts[(12, None)], state="disabled")
         self.logs_text.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
         
+        # Underlying tk.Text, written to directly by the log flush
+        self._tk_logs = self.logs_text._textbox
+        
         # Scroll to bottom
         self.logs_text.see("end")
     
@@ -534,10 +802,10 @@ class BotGUI:
         status_frame.grid(row=1, column=1, sticky="ew", padx=(0, 10), pady=(0, 10))
         status_frame.grid_columnconfigure(0, weight=1)
         
-        self.status_label = ctk.CTkLabel(status_frame, text="Ready", font=ctk.CTkFont(size=12))
+        self.status_label = ctk.CTkLabel(status_frame, text="Ready", font=self._fonts[(12, None)])
         self.status_label.grid(row=0, column=0, padx=10, pady=5, sticky="w")
         
-        self.connection_label = ctk.CTkLabel(status_frame, text="Disconnected", font=ctk.CTkFont(size=12))
+        self.connection_label = ctk.CTkLabel(status_frame, text="Disconnected", font=self._fonts[(12, None)])
         self.connection_label.grid(row=0, column=1, padx=10, pady=5, sticky="e")
     
     def setup_gui_logger(self):
@@ -545,39 +813,123 @@ class BotGUI:
         class GUILogHandler:
             def __init__(self, gui):
                 self.gui = gui
+                # Unfinished line per thread, so print() calls from the bot,
+                # logging and settings threads can't splice into each other
+                self._local = threading.local()
             
             def write(self, message):
                 try:
-                    if message.strip():
-                        self.gui.add_log(message.strip())
+                    # Log whole lines only; print() writes its text, separators
+                    # and newline as separate calls
+                    partial = getattr(self._local, "partial", "")
+                    *lines, self._local.partial = (partial + message).split("\n")
+                    for line in lines:
+                        if line.strip():
+                            self.gui.add_log(line.strip())
                 except Exception:
                     # GUI might be destroyed, ignore logging errors
                     pass
             
             def flush(self):
+                # Logging flushes after every record; a line another call is
+                # still writing stays buffered until its newline arrives
                 pass
         
         # Redirect stdout to GUI
         sys.stdout = GUILogHandler(self)
+        
+        class GUIRecordHandler(logging.Handler):
+            """Logging handler that queues whole records for the GUI"""
+            
+            def __init__(self, gui):
+                super().__init__()
+                self.gui = gui
+            
+            def emit(self, record):
+                try:
+                    message = self.format(record)
+                except Exception:
+                    self.handleError(record)
+                    return
+                
+                # add_log only appends to a deque, so this is safe from the
+                # logging listener thread
+                for line in message.splitlines():
+                    if line.strip():
+                        self.gui.add_log(line.rstrip())
+        
+        # The bot's console logging goes here rather than through stdout
+        self.log_handler = GUIRecordHandler(self)
+        self.log_handler.setFormatter(logging.Formatter("%(name)s - %(levelname)s - %(message)s"))
     
     def add_log(self, message):
-        """Add a log message to the GUI"""
-        try:
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            formatted_message = f"[{timestamp}] {message}\n"
-            
-            # Add to logs text area
-            self.logs_text.insert("end", formatted_message)
-            self.logs_text.see("end")
+        """Queue a log message for the GUI"""
+        self._pending.append((int(time.time()), message))
+        
+        # Don't make a building burst wait for the next timer tick
+        if len(self._pending) >= self.log_flush_threshold and not self._early_flush_scheduled:
+            self._early_flush_scheduled = True
+            try:
+                self.root.after_idle(self._flush_early)
+            except Exception:
+                # GUI might be destroyed, ignore logging errors
+                pass
+    
+    def _flush_early(self):
+        """Write queued log messages ahead of the flush timer"""
+        # The periodic _flush_logs timer keeps running; its id stays tracked
+        self._early_flush_scheduled = False
+        self._write_logs()
+    
+    def _flush_logs(self):
+        """Write queued log messages and schedule the next flush"""
+        self._write_logs()
+        
+        if self._pending:
+            # Let queued input events run before writing the rest
+            self._flush_after_id = self.root.after_idle(self._flush_logs)
+        else:
+            self._flush_after_id = self.root.after(self.log_flush_interval, self._flush_logs)
+    
+    def _write_logs(self):
+        """Write up to log_flush_max_lines queued messages in one insert"""
+        pending = self._pending
+        if pending:
+            second, timestamp = self._log_stamp
+            batch = []
+            append, popleft = batch.append, pending.popleft
+            for _ in range(min(len(pending), self.log_flush_max_lines)):
+                sent, message = popleft()
+                if sent != second:
+                    second = sent
+                    timestamp = time.strftime("%H:%M:%S", time.localtime(sent))
+                append(f"[{timestamp}] {message}\n")
+            self._log_stamp = (second, timestamp)
+            text = "".join(batch)
             
-            # Limit log size
-            lines = self.logs_text.get("1.0", "end").split('\n')
-            if len(lines) > 1000:
-                # Remove first 200 lines
-                self.logs_text.delete("1.0", "201.0")
-        except Exception:
-            # GUI might be destroyed, ignore logging errors
-            pass
+            try:
+                # Add to logs text area, read-only outside this window
+                logs = self._tk_logs
+                
+                # Only follow new output if the user hasn't scrolled up
+                follow = logs.yview()[1] >= 1.0
+                
+                logs.configure(state="normal")
+                logs.insert("end", text)
+                
+                # Limit log size by dropping the oldest lines
+                self._line_count += text.count("\n")
+                evicted = self._line_count - self.max_log_lines
+                if evicted > 0:
+                    logs.delete("1.0", f"{evicted + 1}.0")
+                    self._line_count = self.max_log_lines
+                
+                logs.configure(state="disabled")
+                if follow:
+                    logs.see("end")
+            except Exception:
+                # GUI might be destroyed, ignore logging errors
+                pass
     
     def update_stats(self):
         """Update statistics display"""
@@ -599,6 +951,10 @@ Active Tasks: {processing_stats['active_tasks']}"""
             except Exception as e:
                 stats = f"Error getting stats: {e}"
         
+        if stats == self._last_stats:
+            return
+        self._last_stats = stats
+        
         self.stats_text.delete("1.0", "end")
         self.stats_text.insert("1.0", stats)
     
@@ -612,17 +968,17 @@ Active Tasks: {processing_stats['active_tasks']}"""
         self.stop_btn.configure(state="normal")
         self.status_label.configure(text="Starting...")
         
-        # Start bot in separate thread
-        self.bot_thread = threading.Thread(target=self.run_bot, daemon=True)
-        self.bot_thread.start()
+        # Run the bot on the background loop
+        asyncio.run_coroutine_threadsafe(self.run_bot(), self.bot_loop)
         
         # Start stats update timer
         self.update_stats_timer()
     
-    def run_bot(self):
-        """Run the bot (called in separate thread)"""
+    async def run_bot(self):
+        """Run the bot (called on the background loop)"""
         try:
             # Create bot instance
+            from main import NakenChatAIBot
             self.bot = NakenChatAIBot()
             
             # Load config
@@ -631,83 +987,128 @@ Active Tasks: {processing_stats['active_tasks']}"""
                 return
             
             # Setup logging
-            self.bot.setup_logging()
+            self.bot.setup_logging(self.log_handler)
             
             # Setup components
             self.bot.setup_components()
             
-            # Run bot
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
             # Update status
-            self.root.after(0, lambda: self.status_label.configure(text="Running"))
-            self.root.after(0, lambda: self.connection_label.configure(text="Connected"))
+            self.root.after(0, self._show_running)
             
             # Run the bot
-            loop.run_until_complete(self.bot.start())
+            await self.bot.start()
             
         except Exception as e:
             self.add_log(f"ERROR: {e}")
             self.root.after(0, self.stop_bot)
     
+    def _show_running(self):
+        """Show the running state in the status bar"""
+        self.status_label.configure(text="Running")
+        self.connection_label.configure(text="Connected")
+    
     def stop_bot(self):
         """Stop the bot"""
         if not self.running:
             return
         
         self.running = False
+        if self._stats_after_id is not None:
+            self.root.after_cancel(self._stats_after_id)
+            self._stats_after_id = None
+        self.update_stats()
         self.start_btn.configure(state="normal")
         self.stop_btn.configure(state="disabled")
         self.status_label.configure(text="Stopping...")
         self.connection_label.configure(text="Disconnected")
         
-        # Stop the bot properly
+        # Stop the bot on the background loop without blocking the GUI
         if self.bot:
-            try:
-                # Create a new event loop for stopping
-                stop_loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(stop_loop)
-                
-                # Stop the bot with a timeout
-                try:
-                    stop_loop.run_until_complete(asyncio.wait_for(self.bot.stop(), timeout=5.0))
-                except asyncio.TimeoutError:
-                    self.add_log("Warning: Bot stop timed out, forcing shutdown")
-                except Exception as e:
-                    self.add_log(f"Error stopping bot: {e}")
-                finally:
-                    stop_loop.close()
-                    
-            except Exception as e:
-                self.add_log(f"Error stopping bot: {e}")
+            future = asyncio.run_coroutine_threadsafe(
+                asyncio.wait_for(self.bot.stop(), timeout=5.0), self.bot_loop
+            )
+            future.add_done_callback(self._on_bot_stopped)
+            self._stop_future = future
+        else:
+            self.status_label.configure(text="Stopped")
+    
+    def _on_bot_stopped(self, future):
+        """Report the outcome of a stop request (called on the background loop)"""
+        try:
+            future.result()
+        except asyncio.TimeoutError:
+            self.add_log("Warning: Bot stop timed out, forcing shutdown")
+        except Exception as e:
+            self.add_log(f"Error stopping bot: {e}")
         
+        self.root.after(0, self._show_stopped)
+    
+    def _show_stopped(self):
+        """Show the stopped state in the status bar"""
         self.status_label.configure(text="Stopped")
     
     def clear_logs(self):
         """Clear the logs display"""
+        self.logs_text.configure(state="normal")
         self.logs_text.delete("1.0", "end")
+        self.logs_text.configure(state="disabled")
+        self._line_count = 0
         self.add_log("Logs cleared")
     
     def open_settings(self):
         """Open settings dialog"""
-        SettingsDialog(self.root)
+        if self._settings is not None and self._settings.dialog.winfo_exists():
+            self._settings.show()
+        else:
+            self._settings = SettingsDialog(self.root, title_font=self._fonts[(20, "bold")])
     
     def update_stats_timer(self):
         """Update stats periodically"""
         if self.running:
             self.update_stats()
-            self.root.after(2000, self.update_stats_timer)  # Update every 2 seconds
+            self._stats_after_id = self.root.after(2000, self.update_stats_timer)  # Update every 2 seconds
+        else:
+            self._stats_after_id = None
     
     def on_closing(self):
         """Handle window closing"""
         if self.running:
             self.add_log("Shutting down bot...")
             self.stop_bot()
-            # Give a moment for cleanup
-            self.root.after(100, self.root.destroy)
+        
+        future = self._stop_future
+        if future is not None and not future.done():
+            # Destroy once the bot has disconnected and closed its session;
+            # the timer only matters if the stop itself never finishes
+            future.add_done_callback(self._on_closing_stopped)
+            self._close_after_id = self.root.after(6000, self._destroy)
         else:
-            self.root.destroy()
+            self._destroy()
+    
+    def _on_closing_stopped(self, future):
+        """Destroy the window after the final stop (called on the background loop)"""
+        try:
+            self.root.after(0, self._destroy)
+        except Exception:
+            # Window already destroyed by the fallback timer
+            pass
+    
+    def _destroy(self):
+        """Cancel the log flush timer, stop the bot loop and destroy the main window"""
+        if self._destroyed:
+            return
+        self._destroyed = True
+        
+        if self._close_after_id is not None:
+            self.root.after_cancel(self._close_after_id)
+            self._close_after_id = None
+        if self._flush_after_id is not None:
+            self.root.after_cancel(self._flush_after_id)
+            self._flush_after_id = None
+        self.bot_loop.call_soon_threadsafe(self.bot_loop.stop)
+        if self._settings is not None:
+            self._settings.close()
+        self.root.destroy()
     
     def run(self):
         """Start the GUI"""
@@ -8,10 +8,15 @@ A Python-based AI bot for NakenChat that connects to Ollama for AI responses.
 import asyncio
 import signal
 import sys
-import yaml
+from contextlib import AsyncExitStack
 from pathlib import Path
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Load environment variables
 load_dotenv()
 
@@ -19,6 +24,7 @@ load_dotenv()
 sys.path.insert(0, str(Path(__file__).parent))
 
 from utils.logger import setup_logger
+from utils.helpers import load_yaml_config
 from bot.ollama_client import OllamaClient
 from bot.chat_client import NakenChatClient
 from bot.rate_limiter import RateLimiter
@@ -40,9 +46,16 @@ class NakenChatAIBot:
         self.context_manager = None
         self.message_processor = None
         
+        # Closes the open connections in reverse order; created by start()
+        self._exit_stack = None
+        
         # Control flags
         self.running = False
         self.shutdown_event = asyncio.Event()
+        
+        # Longest wait for a clean NakenChat disconnect; kept under the GUI's
+        # 5 second stop timeout so the Ollama session still gets closed
+        self.disconnect_timeout = 4.0
     
     def load_config(self) -> bool:
         """Load configuration from YAML file"""
@@ -52,8 +65,8 @@ class NakenChatAIBot:
                 print(f"Configuration file not found: {self.config_path}")
                 return False
             
-            with open(config_file, 'r') as f:
-                self.config = yaml.safe_load(f)
+            # Parsed with the C loader and cached as JSON until the file changes
+            self.config = load_yaml_config(config_file)
             
             return True
             
@@ -61,9 +74,9 @@ class NakenChatAIBot:
             print(f"Error loading configuration: {e}")
             return False
     
-    def setup_logging(self):
-        """Setup logging system"""
-        self.logger = setup_logger("NakenChatAIBot", self.config)
+    def setup_logging(self, console_handler=None):
+        """Setup logging system, optionally sending console output to console_handler"""
+        self.logger = setup_logger("NakenChatAIBot", self.config, console_handler)
         self.logger.info("Logging system initialized")
     
     def setup_components(self):
@@ -119,21 +132,21 @@ class NakenChatAIBot:
         
         # Test Ollama connection
         try:
-            async with self.ollama_client as client:
-                if not await client.test_connection():
-                    self.logger.error("Failed to connect to Ollama API")
-                    return False
-                
-                # Test if default model exists
-                default_model = self.config['ollama']['model']
-                if not await client.check_model_exists(default_model):
-                    self.logger.warning(f"Default model '{default_model}' not found")
-                    models = await client.list_models()
-                    if models:
-                        self.logger.info(f"Available models: {models}")
-                        # Use first available model
-                        self.config['ollama']['model'] = models[0]
-                        self.logger.info(f"Using model: {models[0]}")
+            client = self.ollama_client
+            if not await client.test_connection():
+                self.logger.error("Failed to connect to Ollama API")
+                return False
+            
+            # Test if default model exists
+            default_model = self.config['ollama']['model']
+            if not await client.check_model_exists(default_model):
+                self.logger.warning(f"Default model '{default_model}' not found")
+                models = await client.list_models()
+                if models:
+                    self.logger.info(f"Available models: {models}")
+                    # Use first available model
+                    self.config['ollama']['model'] = models[0]
+                    self.logger.info(f"Using model: {models[0]}")
                 
         except Exception as e:
             self.logger.error(f"Error testing Ollama connection: {e}")
@@ -144,16 +157,31 @@ class NakenChatAIBot:
     
     async def start(self):
         """Start the bot"""
+        self._exit_stack = AsyncExitStack()
         try:
             self.logger.info("Starting NakenChat AI Bot...")
             
-            # Test connections
-            if not await self.test_connections():
+            # Open the HTTP session shared by every Ollama request
+            await self._exit_stack.enter_async_context(self.ollama_client)
+            
+            # Test Ollama while the NakenChat connection opens; the disconnect
+            # is registered first so it runs whichever one fails
+            self._exit_stack.push_async_callback(self._disconnect_chat)
+            ollama_ok, chat_ok = await asyncio.gather(
+                self.test_connections(),
+                self.chat_client.open_connection(),
+                return_exceptions=True
+            )
+            for result in (ollama_ok, chat_ok):
+                if isinstance(result, BaseException):
+                    raise result
+            
+            if not ollama_ok:
                 self.logger.error("Connection tests failed. Exiting.")
                 return False
             
-            # Connect to NakenChat
-            if not await self.chat_client.connect():
+            # Only join the chat and take messages once Ollama is known to work
+            if not chat_ok or not await self.chat_client.join():
                 self.logger.error("Failed to connect to NakenChat server")
                 return False
             
@@ -171,29 +199,41 @@ class NakenChatAIBot:
         except Exception as e:
             self.logger.error(f"Error starting bot: {e}")
             return False
+        finally:
+            # Whatever was opened is closed in reverse order; a no-op after stop()
+            await self._exit_stack.aclose()
+    
+    async def _disconnect_chat(self):
+        """Disconnect from NakenChat, giving up after disconnect_timeout seconds"""
+        try:
+            await asyncio.wait_for(self.chat_client.disconnect(), timeout=self.disconnect_timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning("Disconnect from NakenChat timed out, forcing")
+            if self.chat_client.writer:
+                self.chat_client.writer.transport.abort()
     
     async def stop(self):
         """Stop the bot"""
         self.logger.info("Stopping bot...")
         self.running = False
-        self.shutdown_event.set()
         
-        if self.chat_client:
-            await self.chat_client.disconnect()
+        try:
+            if self._exit_stack is not None:
+                await self._exit_stack.aclose()
+        finally:
+            # Release start() only once everything is closed
+            self.shutdown_event.set()
         
         self.logger.info("Bot stopped")
 
-def signal_handler(signum, frame):
+def request_shutdown(bot):
     """Handle shutdown signals"""
     print("\nReceived shutdown signal. Stopping bot...")
     # Set the shutdown event to trigger the main loop to stop
-    if bot and hasattr(bot, 'shutdown_event'):
-        bot.shutdown_event.set()
+    bot.shutdown_event.set()
 
 async def main():
     """Main entry point"""
-    global bot
-    
     # Create bot instance
     bot = NakenChatAIBot()
     
@@ -205,9 +245,14 @@ async def main():
     # Setup logging
     bot.setup_logging()
     
-    # Setup signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Setup signal handlers; they run on the event loop rather than interrupting it
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, request_shutdown, bot)
+        except NotImplementedError:
+            # Windows event loops have no signal handler support
+            signal.signal(sig, lambda signum, frame: request_shutdown(bot))
     
     try:
         # Setup components
@@ -236,6 +281,9 @@ async def main():
             await bot.stop()
 
 if __name__ == "__main__":
-    bot = None
-    exit_code = asyncio.run(main())
+    # Prefer uvloop's faster event loop when it is installed
+    if uvloop is not None:
+        exit_code = uvloop.run(main())
+    else:
+        exit_code = asyncio.run(main())
     sys.exit(exit_code) 
\ No newline at end of file
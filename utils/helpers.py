@@ -1,131 +1,138 @@
 import re
 import asyncio
-from typing import Optional, List, Dict, Any
+import json
+import os
+from collections import deque
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Iterable, Dict, Any, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Read the config cache with orjson when available
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Common NakenChat line formats, used as-is for multi-line text: [1]username: message, <1>username: message, username: message
+_MESSAGE_PATTERNS = (
+    re.compile(r'^\[(\d+)\]([^:]+):\s*(.+)$'),
+    re.compile(r'^<(\d+)>([^:]+):\s*(.+)$'),
+    re.compile(r'^([^:]+):\s*(.+)$'),
+)
 
 def sanitize_message(message: str) -> str:
     """Clean and sanitize incoming messages"""
     if not message:
         return ""
     
-    # Remove null characters and extra whitespace
-    message = re.sub(r'\x00', '', message)
-    message = re.sub(r'\r\n', '\n', message)
-    message = re.sub(r'\r', '\n', message)
-    message = message.strip()
+    # Remove null characters and extra whitespace; most lines contain
+    # neither, so they only pay for the two membership checks
+    if '\x00' in message:
+        message = message.replace('\x00', '')
+    if '\r' in message:
+        message = message.replace('\r\n', '\n').replace('\r', '\n')
     
-    return message
+    return message.strip()
 
-def extract_username_from_message(message: str) -> Optional[str]:
-    """Extract username from NakenChat message format"""
-    # Common patterns: [1]username: message, <1>username: message, username: message
-    patterns = [
-        r'^\[(\d+)\]([^:]+):\s*(.+)$',
-        r'^<(\d+)>([^:]+):\s*(.+)$',
-        r'^([^:]+):\s*(.+)$'
-    ]
-    
-    for pattern in patterns:
-        try:
-            match = re.match(pattern, message)
+def parse_naken_message(message: str) -> Optional[Tuple[str, str]]:
+    """Split a NakenChat line into (username, content), or None if it has no username"""
+    if '\n' in message:
+        # Multi-line text keeps the exact regex semantics
+        for pattern in _MESSAGE_PATTERNS:
+            match = pattern.match(message)
             if match:
-                groups = match.groups()
-                if len(groups) >= 3:
-                    # Pattern with group number: [1]username: message
-                    return groups[1]  # Username is the second group
-                elif len(groups) >= 2:
-                    # Pattern without group number: username: message
-                    return groups[0]  # Username is the first group
-        except (IndexError, AttributeError) as e:
-            # Log the error for debugging but continue with next pattern
-            print(f"Error parsing message '{message}' with pattern '{pattern}': {e}")
-            continue
-    
-    return None
+                return match.group(match.lastindex - 1, match.lastindex)
+        return None
+    
+    head, sep, tail = message.partition(':')
+    if not head or not sep:
+        return None
+    
+    # Whitespace after the colon is skipped, but the content needs at least one character
+    content = tail.lstrip() or tail[-1:]
+    if not content:
+        return None
+    
+    # Pattern with group number: [1]username: message or <1>username: message
+    first = head[0]
+    if first == '[' or first == '<':
+        close = head.find(']' if first == '[' else '>')
+        if close > 1 and head[1:close].isdecimal() and close + 1 < len(head):
+            return head[close + 1:], content
+    
+    # Pattern without group number: username: message
+    return head, content
+
+def extract_username_from_message(message: str) -> Optional[str]:
+    """Extract username from NakenChat message format
+    
+    Use parse_naken_message instead when the content is needed too.
+    """
+    parts = parse_naken_message(message)
+    return parts[0] if parts else None
 
 def extract_message_content(message: str) -> str:
-    """Extract the actual message content from NakenChat format"""
-    # Remove user prefixes and get just the message part
-    patterns = [
-        r'^\[(\d+)\]([^:]+):\s*(.+)$',
-        r'^<(\d+)>([^:]+):\s*(.+)$',
-        r'^([^:]+):\s*(.+)$'
-    ]
-    
-    for pattern in patterns:
-        try:
-            match = re.match(pattern, message)
-            if match:
-                groups = match.groups()
-                if len(groups) >= 3:
-                    # Pattern with group number: [1]username: message
-                    return groups[2]  # Message content is the third group
-                elif len(groups) >= 2:
-                    # Pattern without group number: username: message
-                    return groups[1]  # Message content is the second group
-        except (IndexError, AttributeError) as e:
-            # Log the error for debugging but continue with next pattern
-            print(f"Error parsing message '{message}' with pattern '{pattern}': {e}")
-            continue
-    
-    return message
+    """Extract the actual message content from NakenChat format
+    
+    Use parse_naken_message instead when the username is needed too.
+    """
+    parts = parse_naken_message(message)
+    return parts[1] if parts else message
+
+@lru_cache(maxsize=32)
+def _trigger_re(trigger: str) -> re.Pattern:
+    """Case insensitive pattern for a trigger word; triggers rarely change, so it is cached"""
+    return re.compile(re.escape(trigger), re.IGNORECASE)
 
 def is_bot_trigger(message: str, trigger: str) -> bool:
     """Check if message contains bot trigger (case insensitive)"""
     if not message or not trigger:
         return False
     
-    # Case insensitive search
-    return trigger.lower() in message.lower()
+    # Case insensitive search without lowercasing a copy of the message
+    return _trigger_re(trigger).search(message) is not None
 
-def is_bot_command(message: str, trigger: str) -> bool:
-    """Check if message is a bot command (trigger followed by command)"""
+def _text_after_trigger(message: str, trigger: str) -> str:
+    """Get the stripped text following the first trigger in message, or '' if there is none"""
     if not message or not trigger:
-        return False
+        return ""
+    
+    match = _trigger_re(trigger).search(message)
+    if match is None:
+        return ""
     
+    return message[match.end():].strip()
+
+def is_bot_command(message: str, trigger: str) -> bool:
+    """Check if message is a bot command (trigger followed by command)"""
     # Look for trigger followed by a command
     # Pattern: trigger command (e.g., "BotName help", "BotName model llama2")
-    trigger_lower = trigger.lower()
-    message_lower = message.lower()
-    
-    # Find trigger position
-    trigger_pos = message_lower.find(trigger_lower)
-    if trigger_pos == -1:
-        return False
-    
-    # Check if there's text after the trigger that could be a command
-    after_trigger = message[trigger_pos + len(trigger):].strip()
-    return len(after_trigger) > 0
+    return len(_text_after_trigger(message, trigger)) > 0
 
 def truncate_response(response: str, max_length: int) -> str:
     """Truncate response to maximum length"""
     if len(response) <= max_length:
         return response
     
-    # Try to truncate at word boundary
-    truncated = response[:max_length-3]
-    last_space = truncated.rfind(' ')
+    # Try to truncate at word boundary, searching in place instead of slicing first
+    cut = max_length - 3
+    last_space = response.rfind(' ', 0, cut)
     
     if last_space > max_length * 0.8:  # If we can find a good break point
-        return truncated[:last_space] + "..."
+        return response[:last_space] + "..."
     
-    return truncated + "..."
+    return response[:cut] + "..."
 
 def parse_command(message: str, trigger: str) -> Optional[Dict[str, Any]]:
     """Parse bot commands like 'trigger help', 'trigger model llama2', etc."""
-    if not is_bot_command(message, trigger):
+    # Extract text after trigger; a single search serves both the check and the split
+    after_trigger = _text_after_trigger(message, trigger)
+    if not after_trigger:
         return None
     
-    trigger_lower = trigger.lower()
-    message_lower = message.lower()
-    
-    # Find trigger position
-    trigger_pos = message_lower.find(trigger_lower)
-    if trigger_pos == -1:
-        return None
-    
-    # Extract text after trigger
-    after_trigger = message[trigger_pos + len(trigger):].strip()
-    
     # Split into command and args
     parts = after_trigger.split(maxsplit=1)
     command = parts[0].lower()  # Convert to lowercase
@@ -148,13 +155,62 @@ async def safe_delay(seconds: float):
     except asyncio.CancelledError:
         pass
 
-def format_context(context: List[str]) -> str:
-    """Format conversation context for AI prompt"""
+def format_context(context: Iterable[str]) -> str:
+    """Format conversation context for AI prompt
+    
+    Accepts a list or any other iterable, such as ContextManager's deques;
+    a deque bounded to 5 or fewer messages is used without copying.
+    """
     if not context:
         return ""
     
-    formatted = []
-    for i, msg in enumerate(context[-5:], 1):  # Last 5 messages
-        formatted.append(f"Message {i}: {msg}")
+    # Last 5 messages
+    if isinstance(context, deque):
+        if context.maxlen is None or context.maxlen > 5:
+            context = deque(context, maxlen=5)
+    elif isinstance(context, Sequence):
+        context = context[-5:]
+    else:
+        context = deque(context, maxlen=5)
+    
+    return "\n".join(f"Message {i}: {msg}" for i, msg in enumerate(context, 1))
+
+def load_yaml_config(path) -> Any:
+    """Load a YAML config file, reusing a JSON copy while the file is unchanged
+    
+    The parsed config is cached beside the file as <name>.cache.json, stamped
+    with the file's mtime and size, so YAML is only parsed after an edit.
+    """
+    # Imported here so callers that never load a config don't pay for PyYAML
+    import yaml
+    try:
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeLoader as Loader
+    
+    path = Path(path)
+    cache_path = path.with_name(path.name + '.cache.json')
+    stat = path.stat()
+    stamp = [stat.st_mtime_ns, stat.st_size]
+    
+    try:
+        cached = _json_loads(cache_path.read_bytes())
+        if cached['stamp'] == stamp:
+            return cached['config']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    
+    with open(path, 'r') as f:
+        config = yaml.load(f, Loader=Loader)
+    
+    # Only cache configs that survive a JSON round trip unchanged
+    try:
+        data = json.dumps({'stamp': stamp, 'config': config})
+        if json.loads(data)['config'] == config:
+            tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+            tmp_path.write_text(data)
+            os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        pass
     
-    return "\n".join(formatted) 
\ No newline at end of file
+    return config
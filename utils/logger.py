@@ -1,4 +1,7 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from colorama import init, Fore, Style
 from pathlib import Path
@@ -17,44 +20,92 @@ class ColoredFormatter(logging.Formatter):
         'CRITICAL': Fore.RED + Style.BRIGHT
     }
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Colored level names are fixed, so build them once
+        self._colored = {
+            level: f"{color}{level}{Style.RESET_ALL}" for level, color in self.COLORS.items()
+        }
+    
     def format(self, record):
-        # Add color to levelname
-        if record.levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[record.levelname]}{record.levelname}{Style.RESET_ALL}"
-        
-        return super().format(record)
+        # Add color to levelname, restoring it so other handlers see the plain name
+        levelname = record.levelname
+        record.levelname = self._colored.get(levelname, levelname)
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+# Size limit and number of old files kept for the rotating log file
+LOG_FILE_MAX_BYTES = 10_000_000
+LOG_FILE_BACKUP_COUNT = 3
 
-def setup_logger(name, config):
-    """Setup logger with console and file handlers"""
+def setup_logger(name, config, console_handler=None):
+    """Setup logger with console and file handlers
+    
+    console_handler, if given, replaces the colored stdout handler; the GUI
+    uses it to receive whole records instead of text written to stdout.
+    
+    The handlers run on a QueueListener thread, so console and file writes
+    never block the event loop; the logger itself only enqueues records.
+    The listener is kept as logger.queue_listener.
+    """
+    
+    # Resolve the level once; names are case-insensitive and unknown ones mean INFO
+    level = getattr(logging, str(config['logging']['level']).upper(), logging.INFO)
     
     # Create logger
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, config['logging']['level']))
+    logger.setLevel(level)
     
-    # Clear existing handlers
+    # Clear existing handlers, stopping the listener of a previous setup
+    listener = getattr(logger, 'queue_listener', None)
+    if listener is not None:
+        listener.stop()
+        atexit.unregister(listener.stop)
+        logger.queue_listener = None
     logger.handlers.clear()
+    handlers = []
     
     # Console handler with colors
     if config['logging']['console']:
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(getattr(logging, config['logging']['level']))
+        if console_handler is None:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_formatter = ColoredFormatter(
+                f"{Fore.BLUE}%(asctime)s{Style.RESET_ALL} - %(name)s - %(levelname)s - %(message)s"
+            )
+            console_handler.setFormatter(console_formatter)
         
-        console_formatter = ColoredFormatter(
-            f"{Fore.BLUE}%(asctime)s{Style.RESET_ALL} - %(name)s - %(levelname)s - %(message)s"
-        )
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        console_handler.setLevel(level)
+        handlers.append(console_handler)
     
     # File handler
     if config['logging']['file']:
         log_file = Path(config['logging']['file'])
         log_file.parent.mkdir(parents=True, exist_ok=True)
         
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(getattr(logging, config['logging']['level']))
+        # Opened on the first record; rotated so the log can't grow without bound
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True
+        )
+        file_handler.setLevel(level)
         
         file_formatter = logging.Formatter(config['logging']['format'])
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    if handlers:
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        # Flush whatever is still queued when the process exits
+        atexit.register(listener.stop)
+        logger.queue_listener = listener
     
     return logger 
\ No newline at end of file